@@ -0,0 +1,66 @@
+"""
+Benchmark the convexhull_rot4 normalization against rotating every orbit point.
+
+Run with `python benchmarks/normalization.py`.
+"""
+
+from time import perf_counter
+from timeit import timeit
+
+import numpy as np
+from scipy import spatial
+
+from commensurability.tessellation import Tessellation
+
+
+def rot4_all_points(points):
+    x, y, *rest = points.T
+    rotated = np.concatenate(
+        [
+            np.array([+x, +y, *rest]).T,
+            np.array([-y, +x, *rest]).T,
+            np.array([-x, -y, *rest]).T,
+            np.array([+y, -x, *rest]).T,
+        ]
+    )
+    return spatial.ConvexHull(rotated).volume
+
+
+def rot4_hull_vertices(points, number):
+    # time the routine on fresh tessellations, as tessellations keep computed normalizations
+    total = 0.0
+    for _ in range(number):
+        tess = Tessellation(points, incremental=False, normalization_routine="convexhull")
+        start = perf_counter()
+        volume = tess.normalization_consts(["convexhull_rot4"])["convexhull_rot4"]
+        total += perf_counter() - start
+    return volume, total / number
+
+
+def orbit_points(npoints, ndim, rng):
+    # a loop orbit with some thickness in every dimension
+    t = np.linspace(0, 40 * np.pi, npoints)
+    R = 8 + 2 * np.cos(np.sqrt(2) * t)
+    points = [R * np.cos(t), R * np.sin(t)]
+    points += [np.sin(np.sqrt(3 + i) * t) for i in range(ndim - 2)]
+    return np.array(points).T + rng.normal(scale=0.05, size=(npoints, ndim))
+
+
+def main(npoints: int = 10_000, number: int = 5):
+    rng = np.random.default_rng(0)
+    for ndim in (3, 4):
+        points = orbit_points(npoints, ndim, rng)
+        volume, t_hull = rot4_hull_vertices(points, number)
+        assert np.isclose(rot4_all_points(points), volume)
+
+        t_all = timeit(lambda: rot4_all_points(points), number=number) / number
+        nhull = len(spatial.ConvexHull(points).vertices)
+        print(
+            f"{ndim}D convexhull_rot4 ({npoints} points, {nhull} on hull): "
+            f"all points {t_all * 1e3:8.2f} ms, hull vertices {t_hull * 1e3:8.2f} ms, "
+            f"speedup {t_all / t_hull:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
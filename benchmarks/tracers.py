@@ -0,0 +1,59 @@
+"""
+Benchmark the batched simplex tracer computation against the per-simplex loop.
+
+Run with `python benchmarks/tracers.py`.
+"""
+
+from timeit import timeit
+
+import numpy as np
+from scipy import spatial
+
+from commensurability.tessellation.dim2 import Tessellation2D
+from commensurability.tessellation.dim3 import Tessellation3D
+from commensurability.tessellation.generic import TessellationGeneric
+
+
+def scalar_tracers(cls, points, simplices):
+    largest, smallest, measure = [], [], []
+    for simplex in simplices:
+        vertices = points[simplex]
+        side_lens = cls.simplex_sides(*vertices)
+        largest.append(max(side_lens))
+        smallest.append(min(side_lens))
+        measure.append(cls.simplex_measure(*vertices))
+    return np.array(largest), np.array(smallest), np.array(measure)
+
+
+def batched_tracers(cls, points, simplices):
+    vertices = points[simplices]
+    side_lens = cls.batch_simplex_sides(vertices)
+    return (
+        np.max(side_lens, axis=1),
+        np.min(side_lens, axis=1),
+        cls.batch_simplex_measures(vertices),
+    )
+
+
+def main(npoints: int = 500, number: int = 5):
+    rng = np.random.default_rng(0)
+    for cls, ndim in ((Tessellation2D, 2), (Tessellation3D, 3), (TessellationGeneric, 4)):
+        points = rng.normal(size=(npoints, ndim))
+        simplices = spatial.Delaunay(points).simplices
+
+        for expected, result in zip(
+            scalar_tracers(cls, points, simplices), batched_tracers(cls, points, simplices)
+        ):
+            assert np.allclose(expected, result)
+
+        t_scalar = timeit(lambda: scalar_tracers(cls, points, simplices), number=number) / number
+        t_batched = timeit(lambda: batched_tracers(cls, points, simplices), number=number) / number
+        print(
+            f"{cls.__name__:>20} ({len(simplices):>6} simplices): "
+            f"loop {t_scalar * 1e3:8.2f} ms, batched {t_batched * 1e3:8.2f} ms, "
+            f"speedup {t_scalar / t_batched:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
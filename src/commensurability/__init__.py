@@ -1,12 +1,16 @@
 """
-This package contains 4 modules and 1 subpackage.
+This package contains 7 modules and 1 subpackage.
 
 The analysis, evaluation, and interactive modules define base classes for
 their relevant purposes. The analysis module in particular also defines
 user-facing classes for 2D and 3D commensurability analysis using the
 tessellation subpackage.
 
-Utility functions are defined in `utils.py`.
+Utility functions are defined in `utils.py`. Functions run by worker
+processes during multiprocessing analysis are defined in `workers.py`, and
+the TCP coordinator distributing analysis chunks to workers on other hosts
+in `coordinator.py`. The on-disk cache of integrated orbits is defined in
+`cache.py`.
 """
 
 from importlib.metadata import version as _version
@@ -9,15 +9,33 @@ commensurability analysis using the tessellation subpackage.
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import inspect
+import os
 import textwrap
+import time
 import warnings
+import weakref
 from abc import abstractmethod
+from collections import deque
 from collections.abc import Mapping as MappingABC
-from math import prod
-from multiprocessing import Pool
+from concurrent.futures import Executor, Future, as_completed
+from contextlib import ExitStack, contextmanager
+from math import ceil, prod
+from multiprocessing.pool import IMapIterator, Pool
 from pathlib import Path
-from typing import Any, Callable, Generator, Mapping, Optional, Sequence, Union
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
 
 import astropy.coordinates as c
 import astropy.units as u
@@ -27,16 +45,93 @@ import pidgey
 from more_itertools import chunked
 from pidgey import AgamaBackend, GalaBackend, GalpyBackend, get_backend_from
 from pidgey.base import Backend
+from scipy.ndimage import distance_transform_edt
 from tqdm import tqdm
 
+from .cache import OrbitCache, integration_digest
 from .evaluation import Evaluation
-from .utils import collapse_coords, make_quantity
+from .utils import (
+    broadcast_components,
+    broadcast_coords,
+    collapse_coords,
+    coords_close,
+    make_quantity,
+)
 from .viewer import AnalysisViewer2D, AnalysisViewer3D, Viewer
+from .workers import (
+    SharedOrbits,
+    evaluate_indexed_orbit,
+    evaluate_orbits,
+    evaluate_shared_orbit,
+    integrate_and_evaluate,
+    integrate_and_evaluate_with,
+    worker_pool,
+)
 
 # define default chunk size for orbit integration
-# unsure how necessary this is, revise exact value as needed
+# unsure how necessary this is, revise exact value as needed; `autotune` measures one instead
 DEFAULT_MAX_CHUNKSIZE = 1000
 
+# default memory budget for integrated orbits held at once by autotuned chunk sizes, in bytes
+DEFAULT_MEMORY_BUDGET = 2**30
+
+# duration of worker evaluation tasks aimed for by autotuned mp_chunksize, in seconds
+TARGET_TASK_SECONDS = 0.01
+
+# backends selected by name
+BACKENDS: dict[str, type[Backend]] = {
+    "agama": AgamaBackend,
+    "gala": GalaBackend,
+    "galpy": GalpyBackend,
+}
+
+# compression filters for stored measures, None for uncompressed
+MEASURES_COMPRESSION = (None, "gzip", "lzf")
+
+# largest chunk of stored measures, in bytes, as for h5py's automatic chunk shapes
+MAX_CHUNK_BYTES = 2**20
+
+# sources of the functions read from files, which inspect cannot find
+_READ_SOURCES: weakref.WeakKeyDictionary[Callable[..., Any], str] = weakref.WeakKeyDictionary()
+
+
+class EvaluatorChannels:
+    """
+    Picklable orbit evaluator applying several evaluators to each orbit, one channel per evaluator.
+
+    Channels are named after the keys of a mapping of evaluators, or after the qualified
+    names of a sequence of evaluators (their indices if these are not unique).
+
+    Attributes:
+        names (List[str]): Name of each channel.
+        evaluators (List[Callable[[c.SkyCoord], float]]): Function computing each channel's measure.
+    """
+
+    def __init__(
+        self,
+        evaluators: Union[Sequence[Callable[[c.SkyCoord], float]], Mapping[str, Callable]],
+    ) -> None:
+        if isinstance(evaluators, MappingABC):
+            self.names = [str(name) for name in evaluators]
+            self.evaluators = list(evaluators.values())
+        else:
+            self.evaluators = list(evaluators)
+            self.names = [getattr(evaluate, "__qualname__", "") for evaluate in self.evaluators]
+            if "" in self.names or len(set(self.names)) < len(self.names):
+                self.names = [str(i) for i in range(len(self.evaluators))]
+        if not self.evaluators:
+            raise ValueError("evaluators must not be empty")
+        for name in self.names:
+            if not name or "/" in name:
+                raise ValueError(f"Invalid channel name: {name!r}")
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return (len(self.evaluators),)
+
+    def __call__(self, orbit: c.SkyCoord) -> np.ndarray:
+        return np.array([evaluate(orbit) for evaluate in self.evaluators], dtype=float)
+
 
 class AnalysisBase(MappingABC):
     """
@@ -56,6 +151,24 @@ class AnalysisBase(MappingABC):
         steps (int): Number of integration steps.
         pattern_speed (u.Quantity): Pattern speed for orbit integration.
         measures (np.ndarray): Array to store orbit measures.
+        done (np.ndarray): Boolean array marking the grid points whose measures are computed.
+        checkpoint (Optional[Path]): HDF5 file where completed chunks are written.
+        pidgey_chunksize (int): Chunk size for orbit integration.
+        lazy (bool): Whether measures are computed only when accessed.
+        mask (np.ndarray): Boolean array of the grid points to compute; the others are NaN.
+        callback (Optional[Callable]): Function called with each completed chunk.
+        executor (Optional[Executor]): Executor evaluating orbits.
+        shard (Optional[Tuple[int, int]]): Index and count of the shard of the grid to compute.
+        orbit_cache (Optional[OrbitCache]): Cache of integrated orbits.
+        channels (Optional[EvaluatorChannels]): Evaluators applied to each orbit, if several.
+        channel_names (Optional[List[str]]): Names of the channels along the last axis of measures.
+        memory_budget (int): Maximum size of the integrated orbits held at once when autotuning.
+        tuning (Optional[Dict[str, Any]]): Chunk sizes and timings chosen by `autotune`.
+        orbits (Optional[np.ndarray]): Positions of the integrated orbits kept in memory, of
+            shape (size, steps, 3) in np.ndindex order and NaN for grid points not integrated,
+            if store_orbits is set without a checkpoint, which orbits are written to instead.
+        orbits_unit (Optional[u.Unit]): Unit of the positions in orbits, as returned by the
+            backend (dimensionless for agama).
     """
 
     @staticmethod
@@ -82,10 +195,23 @@ class AnalysisBase(MappingABC):
         steps: Union[int, np.ndarray],
         *,
         pattern_speed: Union[float, u.Quantity] = 0.0,
-        backend: Optional[Union[str, Backend]] = None,
+        backend: Optional[Union[str, Backend, type[Backend]]] = None,
         progressbar: bool = True,
         pidgey_chunksize: Optional[int] = None,
+        vectorized_ic: Optional[bool] = None,
+        checkpoint: Optional[Any] = None,
+        lazy: bool = False,
+        mask: Optional[Union[np.ndarray, Callable[..., Any]]] = None,
+        callback: Optional[Callable[[list[tuple[int, ...]], np.ndarray], Any]] = None,
+        executor: Optional[Executor] = None,
+        shard: Optional[tuple[int, int]] = None,
+        orbit_cache: Optional[Any] = None,
+        store_orbits: bool = False,
+        evaluators: Optional[Union[Sequence[Callable], Mapping[str, Callable]]] = None,
+        autotune: bool = False,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
         _blank_measures: bool = False,
+        _defer_potential: bool = False,
     ) -> None:
         """
         Initialize AnalysisBase instance.
@@ -97,11 +223,51 @@ class AnalysisBase(MappingABC):
             dt (Union[float, np.ndarray, u.Quantity]): Time step for orbit integration.
             steps (Union[int, np.ndarray]): Number of integration steps.
             pattern_speed (Union[float, u.Quantity], optional): Pattern speed for orbit integration (default 0.0).
-            backend (Optional[Union[str, Backend]], optional): Backend for orbit computation.
+            backend (Optional[Union[str, Backend, type[Backend]]], optional): Backend for orbit
+                computation, or its name or class (default detected from the potential).
             progressbar (bool, optional): Whether to show progress bar during image construction (default True).
             pidgey_chunksize (int, optional): Chunk size for orbit integration (default 1).
+            vectorized_ic (Optional[bool], optional): Whether ic_function accepts arrays of values,
+                detected on the first chunk of several grid points if None (default None).
+            checkpoint (Optional[Any], optional): Path to an HDF5 file where completed chunks are
+                written as they are computed. If the file exists, only its missing pixels are
+                computed (default None).
+            lazy (bool, optional): Whether to compute measures only when they are accessed,
+                instead of the whole grid up front (default False).
+            mask (Optional[Union[np.ndarray, Callable[..., Any]]], optional): Boolean array of the
+                grid points to compute, or a predicate taking arrays of values like ic_function
+                and returning one. Other grid points are never integrated, and their measures
+                are NaN (default None, the whole grid).
+            callback (Optional[Callable[[List[Tuple[int]], np.ndarray], Any]], optional): Function
+                called with the grid points of each completed chunk and the array of their
+                measures (default None).
+            executor (Optional[Executor], optional): Executor evaluating orbits, such as a thread
+                or process pool, or a cluster client implementing the Executor interface. It is
+                not shut down by the analysis (default None, evaluating in this process).
+            shard (Optional[Tuple[int, int]], optional): Index i and count n of the shard of the
+                grid to compute, the i-th of n contiguous blocks of grid points in
+                np.ndindex order. Shard files are combined with `merge` (default None).
+            orbit_cache (Optional[Any], optional): OrbitCache, or path to its directory, storing
+                integrated orbits by potential function source, initial condition, dt, steps,
+                pattern speed and backend. Cached orbits are not integrated again (default None).
+            store_orbits (bool, optional): Whether to keep the positions of integrated orbits in
+                memory, and write them to the checkpoint file as they are integrated, so that
+                `save` stores them for `reevaluate`. They are held as a float64 array of shape
+                (size, steps, 3), taking 24 * size * steps bytes, e.g. 2.4 GB for 10^4 orbits of
+                10^4 steps (default False).
+            evaluators (Optional[Union[Sequence[Callable], Mapping[str, Callable]]], optional):
+                Functions mapping an orbit to a measure, applied to each orbit instead of this
+                class' evaluation. The measures array gains a trailing channel axis, and `save`
+                also writes a dataset named after each channel (default None).
+            autotune (bool, optional): Whether to choose chunk sizes from the throughput measured
+                on the first chunks with `autotune`, starting from the given ones (default False).
+            memory_budget (int, optional): Maximum size of the integrated orbits held at once
+                with autotuned chunk sizes, in bytes (default 1 GiB).
         """
         self.ic_function = ic_function
+        self.vectorized_ic = vectorized_ic
+        # detected settings fall back to per pixel calls if a later chunk fails
+        self._detected_ic = vectorized_ic is None
         self.ic_values = values
         argspec = inspect.getfullargspec(ic_function)
         self.axis_names = argspec.args
@@ -113,7 +279,6 @@ class AnalysisBase(MappingABC):
         self.size = prod(self.shape)
 
         self.potential_function = potential_function
-        self.potential = potential_function()
         self.dt = make_quantity(dt, u.Gyr)
         if self.dt.value <= 0:
             raise ValueError("dt must be greater than 0")
@@ -122,18 +287,17 @@ class AnalysisBase(MappingABC):
             raise ValueError("steps must be greater than 0")
 
         self.pattern_speed = make_quantity(pattern_speed, u.km / u.s / u.kpc)
-        if isinstance(backend, str):
-            if backend == "agama":
-                backend = AgamaBackend()
-            elif backend == "gala":
-                backend = GalaBackend()
-            elif backend == "galpy":
-                backend = GalpyBackend()
-            else:
-                raise ValueError(f"Unrecognized backend: {backend}")
-        self.backend = backend or get_backend_from(self.potential)
-        if not self.backend:
-            raise TypeError(f"Unrecognized potential: {self.potential}")
+        if isinstance(backend, str) and backend not in BACKENDS:
+            raise ValueError(f"Unrecognized backend: {backend}")
+        self._backend_spec = backend
+        self._potential: Any = None
+        # potential functions may return None, e.g. for backends without one
+        self._potential_built = False
+        self._backend: Optional[Backend] = None
+        if not _defer_potential:
+            # build both up front, so that an unusable potential fails here
+            self.potential = potential_function()
+            self.backend = self._make_backend()
 
         if pidgey_chunksize is None:
             pidgey_chunksize = min(int(self.size**0.5), DEFAULT_MAX_CHUNKSIZE)
@@ -142,10 +306,133 @@ class AnalysisBase(MappingABC):
         if pidgey_chunksize >= self.size:
             pidgey_chunksize = self.size
             # raise ValueError("chunksize must be less than total number of starting coordinates")
+        self.pidgey_chunksize = pidgey_chunksize
+        self.lazy = lazy
+        self.callback = callback
+        self.executor = executor
+        self.shard = self._validate_shard(shard)
+        if memory_budget <= 0:
+            raise ValueError("memory_budget must be greater than 0")
+        self.memory_budget = memory_budget
+        self.tuning: Optional[dict[str, Any]] = None
+        if orbit_cache is not None and not isinstance(orbit_cache, OrbitCache):
+            orbit_cache = OrbitCache(orbit_cache)
+        self.orbit_cache = orbit_cache
+        # computed on first use of the orbit cache
+        self._integration_digest: Optional[str] = None
+
+        self.channels = None if evaluators is None else EvaluatorChannels(evaluators)
+        self.channel_names = None if self.channels is None else self.channels.names
+        self.measures = np.zeros(self.shape + self._channel_shape())
+        self.done = np.zeros(self.shape, dtype=bool)
+        self.mask = self._region_of_interest(mask)
+        # masked out grid points count as computed, so they are never integrated
+        self.measures[~self.mask] = np.nan
+        self.done[~self.mask] = True
+        self.store_orbits = store_orbits
+        # positions of each integrated grid point by its index into the flattened grid
+        self._orbit_positions: dict[int, np.ndarray] = {}
+        self.orbits_unit: Optional[u.UnitBase] = None
+        self._orbits_file: Optional[Path] = None
+        self._measures_file: Optional[h5py.File] = None
+        self.checkpoint = None if checkpoint is None else Path(checkpoint)
+        self._checkpoint_file: Optional[h5py.File] = None
+        if self.checkpoint is not None and self.checkpoint.exists():
+            self._load_checkpoint()
+        if not (_blank_measures or lazy):
+            if autotune:
+                self.autotune(progressbar)
+            with self._checkpointing():
+                self._compute_selection(None, progressbar)
+
+    @property
+    def potential(self) -> Any:
+        """
+        Potential generated by potential_function, built on first access if it was deferred.
+        """
+        if not self._potential_built:
+            self.potential = self.potential_function()
+        return self._potential
 
-        self.measures = np.zeros(self.shape)
-        if not _blank_measures:
-            self._construct_image(pidgey_chunksize, progressbar)
+    @potential.setter
+    def potential(self, potential: Any) -> None:
+        self._potential = potential
+        self._potential_built = True
+
+    @property
+    def backend(self) -> Backend:
+        """
+        Backend for orbit computation, created on first access if it was deferred.
+        """
+        if self._backend is None:
+            self._backend = self._make_backend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend: Backend) -> None:
+        self._backend = backend
+
+    def _backend_class(self) -> type:
+        """
+        Class of the backend, without creating it if it was given by name or class.
+
+        Returns:
+            type: Class of the backend.
+        """
+        backend = self._backend_spec
+        if isinstance(backend, str):
+            return BACKENDS[backend]
+        if isinstance(backend, type):
+            return backend
+        # an instance, or detected from the potential
+        return type(backend or self.backend)
+
+    def _integration_settings(self) -> str:
+        """
+        Digest of the settings orbit integration depends on, besides initial conditions.
+
+        Returns:
+            str: Hexadecimal digest, computed on first call.
+        """
+        if self._integration_digest is None:
+            self._integration_digest = integration_digest(
+                _function_source(self.potential_function, "potential_function"),
+                self.dt,
+                self.steps,
+                self.pattern_speed,
+                self._backend_class(),
+            )
+        return self._integration_digest
+
+    def _settings_digest(self) -> str:
+        """
+        Digest of every setting the measures depend on: the grid of initial conditions,
+        the integration settings, and how orbits are evaluated.
+
+        Returns:
+            str: Hexadecimal digest of the settings.
+        """
+        digest = hashlib.sha256(type(self).__name__.encode("utf8"))
+        digest.update(self._integration_settings().encode("utf8"))
+        digest.update(_function_source(self.ic_function, "ic_function").encode("utf8"))
+        for ax in self.axis_names:
+            digest.update(ax.encode("utf8"))
+            digest.update(np.ascontiguousarray(self.ic_values[ax], dtype=float).tobytes())
+        for attr, value in sorted(self._extra_attrs().items()):
+            if attr != "shard":
+                digest.update(f"{attr}={np.asarray(value).tolist()!r}".encode("utf8"))
+        return digest.hexdigest()
+
+    def _make_backend(self) -> Backend:
+        backend = self._backend_spec
+        if isinstance(backend, str):
+            backend = BACKENDS[backend]()
+        elif isinstance(backend, type):
+            backend = backend()
+        backend = backend or get_backend_from(self.potential)
+        if not backend:
+            raise TypeError(f"Unrecognized potential: {self.potential}")
+        return backend
 
     def __len__(self) -> int:
         """
@@ -170,6 +457,8 @@ class AnalysisBase(MappingABC):
         """
         Get the measure at a specific grid point.
 
+        For a lazy analysis, the measure is computed on first access.
+
         Args:
             key: Tuple of indices for the grid point.
 
@@ -179,66 +468,946 @@ class AnalysisBase(MappingABC):
         if not isinstance(key, tuple):
             raise KeyError("key must be a tuple")
         args = [self.ic_values[ax][i] for i, ax in zip(key, self.axis_names)]
+        if self.lazy and not self.done[key]:
+            self.compute(key)
         return self.ic_function(*args), self.measures[key]
 
-    def _construct_image(self, pidgey_chunksize: int = 1, progressbar: bool = True):
+    def compute(self, key: Any = Ellipsis, progressbar: bool = False) -> np.ndarray:
+        """
+        Compute the measures of the selected grid points that are not computed yet.
+
+        Args:
+            key: Index into the grid, e.g. (slice(None), slice(None), 3) for a slice of a
+                three-dimensional grid (default Ellipsis, the whole grid).
+            progressbar (bool, optional): Whether to show progress bar during computation (default False).
+
+        Returns:
+            np.ndarray: The measures of the selected grid points.
+        """
+        with self._checkpointing():
+            self._compute_selection(self._selection(key), progressbar)
+        return self.measures[key]
+
+    def iter_measures(
+        self, key: Any = Ellipsis, progressbar: bool = False, per_chunk: bool = False
+    ) -> Iterator[tuple[Any, np.ndarray]]:
+        """
+        Compute the measures of the selected grid points, yielding them as soon as they are ready.
+
+        Measures are yielded in the order their chunks complete, which for worker processes
+        may differ from the grid order. Grid points computed earlier are not yielded.
+
+        Args:
+            key: Index into the grid, as for `compute` (default Ellipsis, the whole grid).
+            progressbar (bool, optional): Whether to show progress bar during computation (default False).
+            per_chunk (bool, optional): Whether to yield whole chunks instead of single grid points
+                (default False).
+
+        Yields:
+            Tuple[Any, np.ndarray]: A grid point and its measure, or if per_chunk is set, the list of
+                grid points of a chunk and the array of their measures.
+        """
+        with self._checkpointing():
+            for pixels, _ in self._iter_selection(self._selection(key), progressbar):
+                if per_chunk:
+                    yield pixels, self.measures[tuple(np.transpose(pixels))]
+                else:
+                    for pixel in pixels:
+                        yield pixel, self.measures[pixel]
+
+    def _selection(self, key: Any) -> np.ndarray:
+        selection = np.zeros(self.shape, dtype=bool)
+        selection[key] = True
+        return selection
+
+    def hyperplane(self, progressbar: bool = False, **indices: int) -> np.ndarray:
+        """
+        Compute the measures of the hyperplane of grid points with fixed indices along some axes.
+
+        Args:
+            progressbar (bool, optional): Whether to show progress bar during computation (default False).
+            **indices (int): Index along each fixed axis, by axis name.
+
+        Returns:
+            np.ndarray: The measures of the hyperplane, over the remaining axes.
+        """
+        unknown = set(indices) - set(self.axis_names)
+        if unknown:
+            raise KeyError(f"Unrecognized axis names: {', '.join(sorted(unknown))}")
+        key = tuple(indices.get(ax, slice(None)) for ax in self.axis_names)
+        return self.compute(key, progressbar)
+
+    def _region_of_interest(
+        self, mask: Optional[Union[np.ndarray, Callable[..., Any]]]
+    ) -> np.ndarray:
+        """
+        Get the boolean array of the grid points to compute.
+
+        Args:
+            mask (Optional[Union[np.ndarray, Callable[..., Any]]]): Boolean array, or predicate
+                over the values of each grid point, or None for the whole grid.
+
+        Returns:
+            np.ndarray: Boolean array with the shape of the grid.
+        """
+        if mask is None:
+            return np.ones(self.shape, dtype=bool)
+        if callable(mask):
+            grids = np.meshgrid(
+                *(np.asarray(self.ic_values[ax]) for ax in self.axis_names), indexing="ij"
+            )
+            mask = mask(*grids)
+        mask = np.asarray(mask, dtype=bool)
+        try:
+            return np.broadcast_to(mask, self.shape).copy()
+        except ValueError:
+            raise ValueError(
+                f"mask of shape {mask.shape} does not match the grid of shape {self.shape}"
+            ) from None
+
+    def _channel_shape(self) -> tuple[int, ...]:
+        """
+        Shape of the measure computed for each orbit, appended to the shape of the measures array.
+
+        Returns:
+            Tuple[int]: Empty for a single measure per orbit.
+        """
+        if self.channels is not None:
+            return self.channels.shape
+        return ()
+
+    def channel(self, name: str) -> np.ndarray:
+        """
+        Get the measures of a single evaluator channel.
+
+        Args:
+            name (str): Name of the channel.
+
+        Returns:
+            np.ndarray: The measures of the channel, over the grid.
+        """
+        if self.channel_names is None or name not in self.channel_names:
+            raise KeyError(f"Unrecognized channel: {name}")
+        return self.measures[..., self.channel_names.index(name)]
+
+    def _evaluator(self) -> Callable[[c.SkyCoord], Any]:
+        """
+        Get the function mapping an integrated orbit to its measure.
+
+        Returns:
+            Callable[[c.SkyCoord], Any]: Function returning the measure of an orbit.
+        """
+        if self.channels is not None:
+            return self.channels
+        return lambda orbit: self.evaluate(orbit).measure
+
+    def autotune(self, progressbar: bool = False) -> dict[str, Any]:
+        """
+        Choose chunk sizes from the measured throughput of orbit integration and evaluation.
+
+        Chunks from a quarter to four times pidgey_chunksize are integrated and evaluated
+        in this process, and their measures stored. A first chunk of the smallest size is
+        run beforehand, and its timing discarded, as it also pays for one-off costs such as
+        imports. pidgey_chunksize is then set to the size integrating and evaluating the most
+        orbits per second, such that the chunks in flight hold at most memory_budget bytes of
+        integrated orbits. Subclasses evaluating in worker processes also size their evaluation
+        tasks from the time per orbit evaluation.
+
+        Args:
+            progressbar (bool, optional): Whether to print the chosen chunk sizes and timings (default False).
+
+        Returns:
+            Dict[str, Any]: The chosen chunk sizes, the size of an integrated orbit in bytes, and
+                the chunk size, integration and evaluation time in seconds of each trial and of
+                the warm-up chunk. Also stored as `tuning`.
+        """
+        evaluator = self._evaluator()
+        in_flight = self._executor_options()[1] + 1
+        base = self.pidgey_chunksize
+        trials: list[dict[str, Any]] = []
+        orbit_bytes = 0.0
+        sizes = sorted({max(base // 4, 1), max(base // 2, 1), base, 2 * base, 4 * base})
+        with self._checkpointing():
+            for size in [sizes[0]] + sizes:
+                if orbit_bytes:
+                    size = min(size, max(int(self.memory_budget // (orbit_bytes * in_flight)), 1))
+                pixels = next(self._pending_chunks(size), None)
+                if pixels is None:
+                    break
+                start = time.perf_counter()
+                orbits = self._integrate_chunk(pixels)
+                integrated = time.perf_counter()
+                values = [evaluator(orbit) for orbit in orbits]
+                evaluated = time.perf_counter()
+                self._store_chunk(pixels, values)
+                orbit_bytes = max(orbit_bytes, orbits.xyz.nbytes / len(pixels))
+                trials.append(
+                    {
+                        "chunksize": len(pixels),
+                        "integration": integrated - start,
+                        "evaluation": evaluated - integrated,
+                    }
+                )
+
+        # the first chunk only warms up
+        warmup = trials.pop(0) if trials else None
+        tuning: dict[str, Any] = {"pidgey_chunksize": self.pidgey_chunksize}
+        if trials:
+            best = max(
+                trials,
+                key=lambda trial: trial["chunksize"]
+                / max(trial["integration"] + trial["evaluation"], 1e-9),
+            )
+            self.pidgey_chunksize = best["chunksize"]
+            evaluation = sum(trial["evaluation"] for trial in trials)
+            orbits_evaluated = sum(trial["chunksize"] for trial in trials)
+            tuning = {
+                "pidgey_chunksize": self.pidgey_chunksize,
+                **self._tune_task_size(evaluation / orbits_evaluated),
+            }
+        tuning.update(orbit_bytes=orbit_bytes, trials=trials, warmup=warmup)
+        self.tuning = tuning
+        if progressbar:
+            for trial in trials:
+                print(
+                    f"chunksize={trial['chunksize']}: integration {trial['integration']:.3g} s, "
+                    f"evaluation {trial['evaluation']:.3g} s"
+                )
+            chosen = {name: value for name, value in tuning.items() if name.endswith("chunksize")}
+            print("autotuned " + ", ".join(f"{name}={value}" for name, value in chosen.items()))
+        return tuning
+
+    def _tune_task_size(self, seconds_per_orbit: float) -> dict[str, Any]:
+        """
+        Size the evaluation tasks of worker processes, once pidgey_chunksize is tuned.
+
+        Args:
+            seconds_per_orbit (float): Measured evaluation time of an orbit, in seconds.
+
+        Returns:
+            Dict[str, Any]: The chosen task sizes, by attribute name.
+        """
+        return {}
+
+    def refine(self, levels: int, threshold: float, progressbar: bool = False) -> np.ndarray:
+        """
+        Compute measures adaptively, refining the grid only where measures change sharply.
+
+        Measures are first computed on a coarse lattice taking every 2**levels-th grid
+        point along each axis (and the last one). At each level, the lattice spacing is
+        halved inside the cells whose corner measures differ by more than the threshold.
+        The computed grid points are marked in `done`; `resample` fills in the rest.
+
+        Args:
+            levels (int): Number of refinement levels.
+            threshold (float): Largest measure difference across a cell left unrefined.
+            progressbar (bool, optional): Whether to show progress bar during computation (default False).
+
+        Returns:
+            np.ndarray: The measures resampled to the full grid.
+        """
+        if levels < 0:
+            raise ValueError("levels must not be negative")
+        if threshold < 0:
+            raise ValueError("threshold must not be negative")
+        stride = 2**levels
+        selection = np.zeros(self.shape, dtype=bool)
+        selection[np.ix_(*(self._lattice(n, stride) for n in self.shape))] = True
+        with self._checkpointing():
+            self._compute_selection(selection, progressbar)
+            while stride > 1:
+                selection = self._refinement(stride, threshold)
+                stride //= 2
+                self._compute_selection(selection, progressbar)
+        return self.resample()
+
+    @staticmethod
+    def _lattice(n: int, stride: int) -> np.ndarray:
+        return np.unique(np.r_[0:n:stride, n - 1])
+
+    def _refinement(self, stride: int, threshold: float) -> np.ndarray:
+        """
+        Select the grid points of the next refinement level.
+
+        Args:
+            stride (int): Lattice spacing of the current level.
+            threshold (float): Largest measure difference across a cell left unrefined.
+
+        Returns:
+            np.ndarray: Boolean array of the lattice points with half the spacing inside
+                the cells to refine.
+        """
+        lattices = [self._lattice(n, stride) for n in self.shape]
+        grid = np.ix_(*lattices)
+        done = self.done[grid]
+        measures = self.measures[grid].reshape(done.shape + (-1,))
+        # a cell is refined if all its corners are computed and their measures differ
+        cell_shape = tuple(max(len(lattice) - 1, 1) for lattice in lattices)
+        low = np.full(cell_shape + measures.shape[-1:], np.inf)
+        high = np.full(cell_shape + measures.shape[-1:], -np.inf)
+        complete = np.ones(cell_shape, dtype=bool)
+        for corner in np.ndindex((2,) * len(self.shape)):
+            index = tuple(
+                slice(offset, offset + size) if len(lattice) > 1 else slice(0, 1)
+                for offset, size, lattice in zip(corner, cell_shape, lattices)
+            )
+            # masked out corners are NaN, and ignored
+            low = np.fmin(low, measures[index])
+            high = np.fmax(high, measures[index])
+            complete &= done[index]
+        refine = complete & np.any(high - low > threshold, axis=-1)
+
+        fine = np.zeros(self.shape, dtype=bool)
+        fine[np.ix_(*(self._lattice(n, max(stride // 2, 1)) for n in self.shape))] = True
+        cells = np.zeros(self.shape, dtype=bool)
+        for cell in np.argwhere(refine):
+            index = tuple(
+                slice(lattice[i], lattice[min(i + 1, len(lattice) - 1)] + 1)
+                for i, lattice in zip(cell, lattices)
+            )
+            cells[index] = True
+        return fine & cells
+
+    def resample(self) -> np.ndarray:
+        """
+        Get the measures on the full grid, filling points not computed from the nearest computed point.
+
+        Masked out grid points stay NaN.
+
+        Returns:
+            np.ndarray: The measures with every grid point filled in.
+        """
+        computed = self.done & self.mask
+        if self.done.all() or not computed.any():
+            return self.measures.copy()
+        nearest = distance_transform_edt(~computed, return_distances=False, return_indices=True)
+        measures = self.measures[tuple(nearest)]
+        measures[~self.mask] = np.nan
+        return measures
+
+    def _compute_selection(self, selection: Optional[np.ndarray], progressbar: bool):
+        """
+        Compute the measures of the selected grid points that are not computed yet.
+
+        Args:
+            selection (Optional[np.ndarray]): Boolean array of the grid points to compute, or
+                None for the whole grid.
+            progressbar (bool): Whether to show progress bar during computation.
+        """
+        for _ in self._iter_selection(selection, progressbar):
+            pass
+
+    def _iter_selection(
+        self, selection: Optional[np.ndarray], progressbar: bool
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        """
+        Compute the measures of the selected grid points that are not computed yet, chunk by chunk.
+
+        Args:
+            selection (Optional[np.ndarray]): Boolean array of the grid points to compute, or
+                None for the whole grid.
+            progressbar (bool): Whether to show progress bar during computation.
+
+        Yields:
+            Tuple[List[Tuple[int]], Sequence[Any]]: The grid points of a chunk and their measures,
+                once stored.
+        """
+        if self.executor is not None:
+            yield from self._construct_image_with_executor(
+                self.executor, progressbar, selection, *self._executor_options()
+            )
+        else:
+            yield from self._construct_image(self.pidgey_chunksize, progressbar, selection)
+
+    def _executor_options(self) -> tuple[int, int, bool]:
+        """
+        Options for scheduling work on an executor.
+
+        Returns:
+            Tuple[int, int, bool]: Number of orbits per evaluation task, number of chunks
+                evaluated while integrating the next, and whether tasks also integrate orbits.
+        """
+        return max(int(self.pidgey_chunksize**0.5), 1), 0, False
+
+    def _construct_image_with_executor(
+        self,
+        executor: Executor,
+        progressbar: bool = True,
+        selection: Optional[np.ndarray] = None,
+        task_size: int = 1,
+        pipeline_depth: int = 0,
+        integrate_in_workers: bool = False,
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        """
+        Construct an image of a slice of phase space, evaluating orbits with an executor.
+
+        Each chunk is integrated in this process and split into evaluation tasks of
+        `task_size` orbits, while up to `pipeline_depth` earlier chunks are evaluated.
+        If tasks also integrate orbits, each chunk is a single task with its own copy of the
+        analysis, building its own potential and backend, and every chunk is submitted up front.
+
+        Args:
+            executor (Executor): Executor evaluating orbits.
+            progressbar (bool, optional): Whether to show progress bar during construction (default True).
+            selection (Optional[np.ndarray], optional): Boolean array of the grid points to compute
+                (default None, the whole grid).
+            task_size (int, optional): Number of orbits per evaluation task (default 1).
+            pipeline_depth (int, optional): Number of chunks evaluated while integrating the next (default 0).
+            integrate_in_workers (bool, optional): Whether tasks also integrate orbits (default False).
+
+        Yields:
+            Tuple[List[Tuple[int]], Sequence[Any]]: The grid points of a chunk and their measures.
+        """
+        evaluator = self._evaluator()
+        if integrate_in_workers:
+            pipeline_depth = self.size
+        # chunks submitted to the executor and not yet collected, by submission index
+        pending: dict[int, tuple[list[tuple[int, ...]], list[Future]]] = {}
+        try:
+            for index, pixels in enumerate(
+                tqdm(
+                    self._pending_chunks(self.pidgey_chunksize, selection),
+                    desc=f"with pidgey_chunksize={self.pidgey_chunksize}",
+                    total=self._pending_chunk_count(self.pidgey_chunksize, selection),
+                    disable=not progressbar,
+                )
+            ):
+                if integrate_in_workers:
+                    tasks = [
+                        executor.submit(
+                            integrate_and_evaluate_with, self._task_copy(), evaluator, pixels
+                        )
+                    ]
+                else:
+                    orbits = self._integrate_chunk(pixels)
+                    tasks = [
+                        executor.submit(evaluate_orbits, evaluator, orbits[i : i + task_size])
+                        for i in range(0, len(orbits), task_size)
+                    ]
+                pending[index] = (pixels, tasks)
+                if len(pending) > pipeline_depth:
+                    yield from self._collect_completed(pending, pipeline_depth)
+            yield from self._collect_completed(pending, 0)
+        finally:
+            for _, tasks in pending.values():
+                for task in tasks:
+                    task.cancel()
+
+    def _task_copy(self) -> AnalysisBase:
+        """
+        Copy the analysis for a task integrating a chunk of orbits in an executor or worker.
+
+        The copy only keeps what integrating orbits depends on, so that it can be sent to
+        worker processes: it has no measures, masks, callback, stored orbits or files. It
+        builds its own potential and backend, so that tasks running in threads do not share
+        the state of the backend integrating an orbit.
+
+        Returns:
+            AnalysisBase: Copy of the analysis.
+        """
+        analysis = copy.copy(self)
+        analysis.measures = None  # type: ignore[assignment]
+        analysis.done = None  # type: ignore[assignment]
+        analysis.mask = None  # type: ignore[assignment]
+        analysis.callback = None
+        analysis.executor = None
+        analysis.tuning = None
+        analysis.store_orbits = False
+        analysis._orbit_positions = {}
+        analysis._orbits_file = None
+        analysis._measures_file = None
+        analysis.checkpoint = None
+        analysis._checkpoint_file = None
+        analysis._potential = None
+        analysis._potential_built = False
+        analysis._backend = None
+        if isinstance(self._backend_spec, Backend):
+            # backends keep the arguments and result of the last integration
+            analysis._backend_spec = copy.copy(self._backend_spec)
+        return analysis
+
+    def _collect_completed(
+        self, pending: dict[int, tuple[list[tuple[int, ...]], list[Future]]], count: int
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        """
+        Collect chunks of executor tasks as they complete, until at most `count` are pending.
+
+        Args:
+            pending (Dict[int, Tuple[List[Tuple[int]], List[Future]]]): Grid points and tasks of
+                each chunk not yet collected, emptied of the collected chunks.
+            count (int): Number of chunks left pending.
+
+        Yields:
+            Tuple[List[Tuple[int]], Sequence[Any]]: The grid points of a chunk and their measures.
+        """
+        if len(pending) <= count:
+            return
+        chunk_of = {task: index for index, (_, tasks) in pending.items() for task in tasks}
+        remaining = {index: len(tasks) for index, (_, tasks) in pending.items()}
+        for task in as_completed(chunk_of):
+            index = chunk_of[task]
+            remaining[index] -= 1
+            if remaining[index] == 0:
+                yield self._collect_tasks(*pending.pop(index))
+                if len(pending) <= count:
+                    return
+
+    def _collect_tasks(
+        self, pixels: list[tuple[int, ...]], tasks: list[Future]
+    ) -> tuple[list[tuple[int, ...]], Sequence[Any]]:
+        values = [value for task in tasks for value in task.result()]
+        self._store_chunk(pixels, values)
+        return pixels, values
+
+    def _construct_image(
+        self,
+        pidgey_chunksize: int = 1,
+        progressbar: bool = True,
+        selection: Optional[np.ndarray] = None,
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
         """
         Construct an image of a slice of phase space by integrating orbits and evaluating them.
 
         Args:
             pidgey_chunksize (int, optional): Chunk size for batching orbit integration (default 1).
             progressbar (bool, optional): Whether to show progress bar during construction (default True).
+            selection (Optional[np.ndarray], optional): Boolean array of the grid points to compute
+                (default None, the whole grid).
+
+        Yields:
+            Tuple[List[Tuple[int]], Sequence[Any]]: The grid points of a chunk and their measures.
         """
         for pixels in tqdm(
-            chunked(np.ndindex(self.shape), pidgey_chunksize),
+            self._pending_chunks(pidgey_chunksize, selection),
             desc=f"with {pidgey_chunksize=}",
-            total=self.size // pidgey_chunksize,
+            total=self._pending_chunk_count(pidgey_chunksize, selection),
             disable=not progressbar,
         ):
-            coords = []
-            for pixel in pixels:
-                params = [self.ic_values[ax][i] for i, ax in zip(pixel, self.axis_names)]
-                coord = self.ic_function(*params)
-                coords.append(coord)
-            coords = collapse_coords(coords)
-
-            orbits = self.backend.compute_orbit(
-                coords,
-                self.potential,
-                self.dt,
-                self.steps,
-                pattern_speed=self.pattern_speed,
-            )
-            for pixel, orbit in tqdm(
-                zip(pixels, orbits),
-                desc="commensurability evaluation",
-                total=pidgey_chunksize,
+            orbits = self._integrate_chunk(pixels)
+            evaluator = self._evaluator()
+            values = [
+                evaluator(orbit)
+                for orbit in tqdm(
+                    orbits,
+                    desc="commensurability evaluation",
+                    total=len(pixels),
+                    disable=not progressbar,
+                    leave=False,
+                )
+            ]
+            self._store_chunk(pixels, values)
+            yield pixels, values
+
+    def _pending_chunks(
+        self, chunksize: int, selection: Optional[np.ndarray] = None
+    ) -> Iterator[list[tuple[int, ...]]]:
+        """
+        Iterate over chunks of the grid points whose measures are not computed yet.
+
+        Args:
+            chunksize (int): Number of grid points per chunk.
+            selection (Optional[np.ndarray], optional): Boolean array of the grid points to
+                consider (default None, the whole grid).
+
+        Yields:
+            List[Tuple[int]]: Indices of the grid points in a chunk.
+        """
+        pending = (tuple(int(i) for i in pixel) for pixel in np.argwhere(self._pending(selection)))
+        yield from chunked(pending, chunksize)
+
+    def _pending_chunk_count(self, chunksize: int, selection: Optional[np.ndarray] = None) -> int:
+        return -(-int(np.count_nonzero(self._pending(selection))) // chunksize)
+
+    def _pending(self, selection: Optional[np.ndarray] = None) -> np.ndarray:
+        pending = ~self.done if selection is None else selection & ~self.done
+        if self.shard is not None:
+            pending &= self.shard_selection()
+        return pending
+
+    @staticmethod
+    def _validate_shard(shard: Optional[tuple[int, int]]) -> Optional[tuple[int, int]]:
+        if shard is None:
+            return None
+        index, count = (int(i) for i in shard)
+        if count <= 0 or not 0 <= index < count:
+            raise ValueError(f"shard must be (i, n) with 0 <= i < n, got {tuple(shard)}")
+        return index, count
+
+    def shard_selection(self) -> np.ndarray:
+        """
+        Get the grid points computed by this analysis' shard.
+
+        Returns:
+            np.ndarray: Boolean array of the grid points in the shard (all True without sharding).
+        """
+        selection = np.zeros(self.size, dtype=bool)
+        index, count = self.shard or (0, 1)
+        selection[index * self.size // count : (index + 1) * self.size // count] = True
+        return selection.reshape(self.shape)
+
+    def _store_chunk(self, pixels: Sequence[tuple[int, ...]], values: Sequence[Any]):
+        """
+        Store the measures of a chunk of grid points, pass them to the callback, and write them
+        to the checkpoint file.
+
+        Args:
+            pixels (Sequence[Tuple[int]]): Indices of the grid points.
+            values (Sequence[Any]): Measure of each grid point.
+        """
+        for pixel, value in zip(pixels, values):
+            self.measures[pixel] = value
+            self.done[pixel] = True
+        if self.callback is not None and pixels:
+            self.callback(list(pixels), self.measures[tuple(np.transpose(pixels))])
+        f = self._checkpoint_file
+        if f is None or not pixels:
+            return
+        # the file mirrors memory outside the chunk, so each plane is written in one go
+        for box in _plane_boxes(pixels):
+            f[self.__class__.__name__][box] = self.measures[box]
+            f[self._done_dataset_name()][box] = self.done[box]
+        f.flush()
+
+    @classmethod
+    def _done_dataset_name(cls) -> str:
+        return f"{cls.__name__}_done"
+
+    @classmethod
+    def _mask_dataset_name(cls) -> str:
+        return f"{cls.__name__}_mask"
+
+    @classmethod
+    def _orbits_dataset_name(cls) -> str:
+        return f"{cls.__name__}_orbits"
+
+    @contextmanager
+    def _checkpointing(self) -> Iterator[None]:
+        """
+        Keep the checkpoint file open for writing while measures are computed.
+
+        The file is created with the analysis attributes if it does not exist.
+        """
+        if self.checkpoint is None:
+            yield
+            return
+        if not self.checkpoint.exists():
+            self.save(self.checkpoint)
+        with h5py.File(self.checkpoint, "r+") as f:
+            self._checkpoint_file = f
+            try:
+                yield
+            finally:
+                self._checkpoint_file = None
+
+    def _load_checkpoint(self):
+        """
+        Load the computed measures and done mask from an existing checkpoint file.
+
+        Raises:
+            ValueError: If the checkpoint was created with different settings, e.g. another
+                potential, time step or number of steps.
+        """
+        with h5py.File(self.checkpoint, "r") as f:
+            name = self.__class__.__name__
+            if name not in f:
+                raise ValueError(f"Checkpoint {self.checkpoint} has no {name} dataset")
+            dset = f[name]
+            if dset.shape != self.measures.shape or not all(
+                np.array_equal(dset.attrs[ax], self.ic_values[ax]) for ax in self.axis_names
+            ):
+                raise ValueError(f"Checkpoint {self.checkpoint} does not match this analysis")
+            # files saved before the digest was stored are only checked as above
+            settings = dset.attrs.get("settings", self._settings_digest())
+            if settings != self._settings_digest():
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint} was created with different settings "
+                    "(potential, dt, steps, pattern_speed or evaluation)"
+                )
+            self.measures = dset[()]
+            done_name = self._done_dataset_name()
+            self.done = f[done_name][()] if done_name in f else np.ones(self.shape, dtype=bool)
+            orbits_name = self._orbits_dataset_name()
+            if self.store_orbits and orbits_name in f:
+                # streamed by reevaluate rather than loaded
+                self._orbits_file = self.checkpoint
+                self.orbits_unit = _stored_unit(f[orbits_name])
+
+    def _integrate_chunk(self, pixels: Sequence[tuple[int, ...]]) -> Any:
+        """
+        Integrate the orbits for a chunk of pixels.
+
+        Args:
+            pixels (Sequence[Tuple[int]]): Indices of the grid points to integrate.
+
+        Returns:
+            Integrated orbits from the backend, in the same order as pixels.
+        """
+        ics = self._initial_conditions(pixels)
+        if self.orbit_cache is None:
+            orbits = self._compute_orbits(ics)
+        else:
+            orbits = self._cached_orbits(self.orbit_cache, ics)
+        if self.store_orbits:
+            self._store_orbits(pixels, orbits)
+        return orbits
+
+    def _compute_orbits(self, ics: c.SkyCoord) -> Any:
+        return self.backend.compute_orbit(
+            ics, self.potential, self.dt, self.steps, pattern_speed=self.pattern_speed
+        )
+
+    def _store_orbits(self, pixels: Sequence[tuple[int, ...]], orbits: Any):
+        """
+        Keep the positions of a chunk of integrated orbits, or write them to the checkpoint file.
+
+        Positions are kept in the unit the backend returns them in, which `save` stores. With
+        a checkpoint, only the rows of the chunk are written and nothing is kept in memory.
+
+        Args:
+            pixels (Sequence[Tuple[int]]): Indices of the grid points.
+            orbits (c.CartesianRepresentation): Orbit positions of shape (len(pixels), steps).
+        """
+        xyz = orbits.xyz
+        if self.orbits_unit is None:
+            self.orbits_unit = xyz.unit
+        values = xyz.to_value(self.orbits_unit)
+        positions = np.moveaxis(values, 0, -1).reshape(len(pixels), -1, values.shape[0])
+        rows = np.ravel_multi_index(tuple(np.transpose(pixels)), self.shape)
+        f = self._checkpoint_file
+        if f is None:
+            self._orbit_positions.update(zip(rows.tolist(), positions))
+            return
+        name = self._orbits_dataset_name()
+        if name not in f:
+            self._create_orbits_dataset(f, (self.size,) + positions.shape[1:])
+        self._orbits_file = self.checkpoint
+        order = np.argsort(rows)
+        _write_rows(f[name], rows[order], positions[order])
+        f.flush()
+
+    @property
+    def orbits(self) -> Optional[np.ndarray]:
+        """
+        Positions of the integrated orbits kept in memory, assembled into an array of shape
+        (size, steps, 3) on access, or None if none are kept.
+        """
+        if not self._orbit_positions:
+            return None
+        rows = list(self._orbit_positions)
+        first = self._orbit_positions[rows[0]]
+        orbits = np.full((self.size,) + first.shape, np.nan)
+        orbits[rows] = np.stack([self._orbit_positions[row] for row in rows])
+        return orbits
+
+    def _create_orbits_dataset(self, f: h5py.File, shape: tuple[int, ...]) -> h5py.Dataset:
+        chunks = (min(self.pidgey_chunksize, self.size),) + shape[1:]
+        dset = f.create_dataset(
+            self._orbits_dataset_name(),
+            shape=shape,
+            dtype=float,
+            chunks=chunks,
+            compression="gzip",
+            fillvalue=np.nan,
+        )
+        dset.attrs["unit"] = (self.orbits_unit or u.kpc).to_string()
+        return dset
+
+    def reevaluate(
+        self, evaluator: Callable[[c.CartesianRepresentation], Any], progressbar: bool = False
+    ) -> np.ndarray:
+        """
+        Evaluate the stored orbits with another function, without integrating them again.
+
+        Orbits are read from memory if they were kept with store_orbits, or streamed
+        chunk by chunk from the file the analysis was read from.
+
+        Args:
+            evaluator (Callable[[c.CartesianRepresentation], Any]): Function mapping the
+                positions of an orbit to its measure.
+            progressbar (bool, optional): Whether to show progress bar during evaluation (default False).
+
+        Returns:
+            np.ndarray: The new measures, NaN for grid points without a stored orbit.
+        """
+        measures: Optional[np.ndarray] = None
+        with ExitStack() as stack:
+            blocks: Iterable[tuple[Iterable[int], Iterable[np.ndarray]]]
+            if self._orbit_positions:
+                rows = sorted(self._orbit_positions)
+                unit = self.orbits_unit or u.kpc
+                blocks = (
+                    (block, [self._orbit_positions[row] for row in block])
+                    for block in chunked(rows, self.pidgey_chunksize)
+                )
+                total = ceil(len(rows) / self.pidgey_chunksize)
+            elif self._orbits_file is not None:
+                f = stack.enter_context(h5py.File(self._orbits_file, "r"))
+                orbits = f[self._orbits_dataset_name()]
+                unit = _stored_unit(orbits)
+                blocks = (
+                    (range(start, start + len(block)), block)
+                    for start in range(0, self.size, self.pidgey_chunksize)
+                    for block in [orbits[start : start + self.pidgey_chunksize]]
+                )
+                total = ceil(self.size / self.pidgey_chunksize)
+            else:
+                raise ValueError("No stored orbits; create the analysis with store_orbits=True")
+            for block_rows, block in tqdm(
+                blocks,
+                total=total,
+                desc="commensurability reevaluation",
                 disable=not progressbar,
-                leave=False,
             ):
-                self.measures[pixel] = self.evaluate(orbit).measure
+                for row, positions in zip(block_rows, block):
+                    if np.isnan(positions).all():
+                        # never integrated
+                        continue
+                    orbit = c.CartesianRepresentation(positions.T, unit=unit, copy=False)
+                    value = evaluator(orbit)
+                    if measures is None:
+                        measures = np.full((self.size,) + np.shape(value), np.nan)
+                    measures[row] = value
+        if measures is None:
+            return np.full(self.shape, np.nan)
+        return measures.reshape(self.shape + measures.shape[1:])
+
+    def _cached_orbits(self, cache: OrbitCache, ics: c.SkyCoord) -> c.CartesianRepresentation:
+        """
+        Get the orbits of initial conditions from the orbit cache, integrating missing ones.
 
-    def save(self, path: Any):
+        Args:
+            cache (OrbitCache): Cache of integrated orbits.
+            ics (c.SkyCoord): Initial conditions of shape (n,).
+
+        Returns:
+            c.CartesianRepresentation: Orbit positions of shape (n, steps).
+        """
+        keys = cache.keys(self._integration_settings(), ics)
+        cached: list[Any] = [cache.get(key) for key in keys]
+        missing = [i for i, positions in enumerate(cached) if positions is None]
+        if missing:
+            xyz = self._compute_orbits(ics[missing]).xyz
+            # backends integrating in natural units, such as agama, return kpc as dimensionless
+            scale = 1.0 if xyz.unit == u.dimensionless_unscaled else xyz.unit.to(u.kpc)
+            positions = np.moveaxis(xyz.value * scale, 0, -1).reshape(len(missing), -1, 3)
+            for i, orbit in zip(missing, positions):
+                cache.put(keys[i], orbit)
+                cached[i] = orbit
+        return c.CartesianRepresentation(np.moveaxis(np.stack(cached), -1, 0), unit=u.kpc)
+
+    def _initial_conditions(self, pixels: Sequence[tuple[int, ...]]) -> c.SkyCoord:
+        """
+        Generate the initial conditions for a chunk of pixels.
+
+        The ic_function is called once on arrays of values for the whole chunk if it
+        supports them, and once per pixel otherwise.
+
+        Args:
+            pixels (Sequence[Tuple[int]]): Indices of the grid points.
+
+        Returns:
+            c.SkyCoord: Initial conditions of shape (len(pixels),).
+        """
+        # a single grid point cannot tell whether ic_function supports arrays
+        if self.vectorized_ic or (self.vectorized_ic is None and len(pixels) > 1):
+            coords = self._vectorized_initial_conditions(pixels)
+            if coords is not None:
+                return coords
+        coords = []
+        for pixel in pixels:
+            params = [self.ic_values[ax][i] for i, ax in zip(pixel, self.axis_names)]
+            coords.append(self.ic_function(*params))
+        return collapse_coords(coords)
+
+    def _vectorized_initial_conditions(
+        self, pixels: Sequence[tuple[int, ...]]
+    ) -> Optional[c.SkyCoord]:
+        """
+        Generate the initial conditions for a chunk of pixels with a single ic_function call.
+
+        Constant components, such as zero velocities alongside array-valued positions, are
+        broadcast to the shape of the chunk by `broadcast_components`. If vectorized_ic is None,
+        the ic_function is checked against scalar calls on every pixel of the chunk. Functions
+        failing the check, or failing on a later chunk after passing it, are called once per
+        pixel from then on.
+
+        Args:
+            pixels (Sequence[Tuple[int]]): Indices of the grid points.
+
+        Returns:
+            Optional[c.SkyCoord]: Initial conditions of shape (len(pixels),), or None if
+                ic_function does not support arrays of values.
+        """
+        indices = np.array(pixels, dtype=int).reshape(len(pixels), len(self.axis_names))
+        params = [
+            np.asarray(self.ic_values[ax])[indices[:, k]] for k, ax in enumerate(self.axis_names)
+        ]
+        ic_function = broadcast_components(self.ic_function)
+        if self.vectorized_ic and not self._detected_ic:
+            return broadcast_coords(ic_function(*params), len(pixels))
+        try:
+            coords = broadcast_coords(ic_function(*params), len(pixels))
+            if self.vectorized_ic is None:
+                scalar = collapse_coords([self.ic_function(*values) for values in zip(*params)])
+                if not coords_close(coords, scalar):
+                    raise ValueError("initial conditions differ from scalar ic_function calls")
+        except (TypeError, ValueError) as e:
+            # e.g. functions using math or control flow on their arguments
+            warnings.warn(
+                f"ic_function does not support arrays of values ({e}), "
+                "calling it once per pixel instead"
+            )
+            self.vectorized_ic = False
+            return None
+        self.vectorized_ic = True
+        return coords
+
+    def save(
+        self,
+        path: Any,
+        store_orbits: Optional[bool] = None,
+        compression: Optional[str] = None,
+        dtype: Optional[Any] = None,
+    ):
         """
         Save the analysis data to an HDF5 file.
 
+        Measures are stored in chunks of one plane over the first two axes, the planes
+        displayed by interactive plots, so that each plane is read in one go. Planes larger
+        than MAX_CHUNK_BYTES are split into tiles.
+
         Args:
             path: Path to the HDF5 file.
+            store_orbits (Optional[bool], optional): Whether to store the positions of the
+                integrated orbits, as a chunked and compressed dataset of shape
+                (size, steps, 3) (default None, if they were kept with store_orbits).
+            compression (Optional[str], optional): Compression filter for the measures,
+                "gzip" or "lzf" (default None, uncompressed).
+            dtype (Optional[Any], optional): Floating point type to store the measures as,
+                e.g. np.float32 (default None, float64).
         """
+        if compression not in MEASURES_COMPRESSION:
+            raise ValueError(
+                f"Unrecognized compression {compression}; available are {MEASURES_COMPRESSION}"
+            )
+        dtype = np.dtype(dtype or float)
+        if dtype.kind != "f":
+            raise ValueError(f"dtype must be a floating point type, got {dtype}")
+        if store_orbits is None:
+            # kept in memory, or streamed to the checkpoint
+            store_orbits = bool(self._orbit_positions) or (
+                self.store_orbits and self._orbits_file is not None
+            )
+        if store_orbits and not self._orbit_positions and self._orbits_file is None:
+            raise ValueError("No integrated orbits; create the analysis with store_orbits=True")
         path = Path(path)
         if not path.parent.exists():
             print("Parent directory does not exist; creating directory.")
             path.parent.mkdir(parents=True)
 
-        # store image mapping function source
-        icsource = inspect.getsource(self.ic_function)
-        icsource = textwrap.dedent(icsource)
-        icsource = icsource.replace(self.ic_function.__name__, "ic_function", 1)
-
-        # store potential function source
-        potsource = inspect.getsource(self.potential_function)
-        potsource = textwrap.dedent(potsource)
-        potsource = potsource.replace(self.potential_function.__name__, "potential_function", 1)
+        # store image mapping and potential function sources
+        icsource = _function_source(self.ic_function, "ic_function")
+        potsource = _function_source(self.potential_function, "potential_function")
 
         attrs = dict(
             icfunc=np.void(icsource.encode("utf8")),
@@ -247,25 +1416,254 @@ class AnalysisBase(MappingABC):
             steps=self.steps,
             pattern_speed=self.pattern_speed,
             backend=np.void(self.backend.__class__.__name__.encode("utf8")),
+            # checked by `_load_checkpoint` when the file is resumed
+            settings=self._settings_digest(),
+            **self._extra_attrs(),
         )
         with h5py.File(path, "w") as f:
-            dset = f.create_dataset(self.__class__.__name__, data=self.measures)
+            dset = f.create_dataset(
+                self.__class__.__name__,
+                data=np.asarray(self.measures, dtype=dtype),
+                chunks=_plane_chunks(self.measures.shape, dtype.itemsize),
+                compression=compression,
+            )
             for attr, value in attrs.items():
                 dset.attrs[attr] = value
             for attr, value in self.ic_values.items():
                 dset.attrs[attr] = value
+            if self.checkpoint is not None or not self.done.all():
+                f.create_dataset(self._done_dataset_name(), data=self.done, chunks=True)
+            if not self.mask.all():
+                f.create_dataset(self._mask_dataset_name(), data=self.mask, chunks=True)
+            if store_orbits and self._orbit_positions:
+                rows = sorted(self._orbit_positions)
+                steps = self._orbit_positions[rows[0]].shape
+                orbits = self._create_orbits_dataset(f, (self.size,) + steps)
+                for block in chunked(rows, self.pidgey_chunksize):
+                    positions = np.stack([self._orbit_positions[row] for row in block])
+                    _write_rows(orbits, np.array(block), positions)
+            elif store_orbits and self._orbits_file is not None:
+                with h5py.File(self._orbits_file, "r") as source:
+                    source.copy(source[self._orbits_dataset_name()], f)
+            if self.channel_names is not None:
+                self._create_channel_datasets(f, self.channel_names)
+
+    @classmethod
+    def _create_channel_datasets(cls, f: h5py.File, names: Sequence[str]):
+        """
+        Create a dataset named after each channel, viewing its slice of the measures dataset.
+
+        Args:
+            f (h5py.File): File holding the measures dataset.
+            names (Sequence[str]): Names of the channels along the last axis of measures.
+        """
+        # "." refers to the file itself, so that the views survive renaming it
+        dset = f[cls.__name__]
+        source = h5py.VirtualSource(".", cls.__name__, shape=dset.shape)
+        for index, name in enumerate(names):
+            layout = h5py.VirtualLayout(shape=source.shape[:-1], dtype=dset.dtype)
+            layout[...] = source[..., index]
+            f.create_virtual_dataset(f"{cls._channels_group_name()}/{name}", layout, np.nan)
+
+    @classmethod
+    def _channels_group_name(cls) -> str:
+        return f"{cls.__name__}_channels"
+
+    def _extra_attrs(self) -> dict[str, Any]:
+        """
+        Additional attributes to store alongside the measures by `save`.
+
+        Returns:
+            Dict[str, Any]: Attribute names and values.
+        """
+        attrs: dict[str, Any] = {}
+        if self.shard is not None:
+            attrs["shard"] = self.shard
+        if self.channel_names is not None:
+            attrs["channels"] = self.channel_names
+        return attrs
+
+    @classmethod
+    def _init_kwargs_from_attrs(cls, attrs: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Keyword arguments to restore from attributes stored by `save`.
+
+        Args:
+            attrs: Attributes of the stored measures dataset.
+
+        Returns:
+            Dict[str, Any]: Keyword arguments for the class constructor.
+        """
+        if "shard" not in attrs:
+            return {}
+        return {"shard": tuple(int(i) for i in attrs["shard"])}
+
+    @classmethod
+    def merge(cls, paths: Sequence[Any], path: Any) -> None:
+        """
+        Merge the HDF5 files of analysis shards into a single file.
+
+        The shards must have the same shape, attributes (including the values of the initial
+        condition parameters) and mask. The measures of each grid point are taken from the shard
+        that computed it.
+
+        Args:
+            paths (Sequence[Any]): Paths to the HDF5 files of the shards.
+            path: Path to the merged HDF5 file.
+        """
+        if not paths:
+            raise ValueError("No shard files to merge")
+        name = cls.__name__
+        done_name = cls._done_dataset_name()
+        mask_name = cls._mask_dataset_name()
+        with h5py.File(paths[0], "r") as f:
+            reference = f[name]
+            attrs = {attr: value for attr, value in reference.attrs.items() if attr != "shard"}
+            measures = np.full(reference.shape, np.nan)
+            mask = f[mask_name][()] if mask_name in f else None
+        # grid points computed by any shard; None once a shard computed the whole grid
+        done: Optional[np.ndarray] = np.zeros((), dtype=bool)
+        for shard_path in paths:
+            with h5py.File(shard_path, "r") as f:
+                dset = f[name]
+                other = {attr: value for attr, value in dset.attrs.items() if attr != "shard"}
+                if dset.shape != measures.shape:
+                    raise ValueError(
+                        f"{shard_path} has shape {dset.shape}, "
+                        f"inconsistent with {measures.shape} of {paths[0]}"
+                    )
+                # the settings digest only differs along with the attributes it covers
+                differing = [attr for attr in _differing_attrs(attrs, other) if attr != "settings"]
+                if differing:
+                    raise ValueError(
+                        f"{shard_path} is inconsistent with {paths[0]} in {', '.join(differing)}"
+                    )
+                other_mask = f[mask_name][()] if mask_name in f else None
+                if mask is None or other_mask is None:
+                    same_mask = mask is other_mask
+                else:
+                    same_mask = np.array_equal(mask, other_mask)
+                if not same_mask:
+                    raise ValueError(f"{shard_path} has a different mask than {paths[0]}")
+                if done_name not in f:
+                    measures[...] = dset[()]
+                    done = None
+                elif done is not None:
+                    computed = f[done_name][()]
+                    if computed.shape != measures.shape[: computed.ndim]:
+                        raise ValueError(f"{shard_path} has a done mask of the wrong shape")
+                    measures[computed] = dset[()][computed]
+                    done = done | computed
+
+        path = Path(path)
+        if not path.parent.exists():
+            print("Parent directory does not exist; creating directory.")
+            path.parent.mkdir(parents=True)
+        with h5py.File(path, "w") as f:
+            dset = f.create_dataset(
+                name, data=measures, chunks=_plane_chunks(measures.shape, measures.itemsize)
+            )
+            for attr, value in attrs.items():
+                dset.attrs[attr] = value
+            if done is not None and not done.all():
+                warnings.warn("Merged shards do not cover the whole grid")
+                f.create_dataset(done_name, data=done, chunks=True)
+            if mask is not None:
+                f.create_dataset(mask_name, data=mask, chunks=True)
+            if "channels" in attrs:
+                cls._create_channel_datasets(f, [str(name) for name in attrs["channels"]])
 
     @classmethod
-    def read_from_hdf5(cls, path: Any, backend_cls: Optional[Backend] = None) -> AnalysisBase:
+    def read_from_hdf5(
+        cls, path: Any, backend_cls: Optional[Backend] = None, lazy_measures: bool = False
+    ) -> AnalysisBase:
         """
         Read analysis data from an HDF5 file.
 
         Args:
             path: Path to the HDF5 file.
+            backend_cls (Optional[Backend]): Backend class to use instead of the stored one.
+            lazy_measures (bool, optional): Whether to keep the file open and read measures
+                only when sliced, instead of loading them. The measures are then a read-only
+                h5py dataset, until `close` is called or the `with` block using the analysis
+                exits (default False).
 
         Returns:
             AnalysisBase: Instance of AnalysisBase class with loaded data.
         """
+        ic_function, values, kwargs = cls._read_init_args(path, backend_cls)
+        # the potential and backend are only built once orbits are integrated
+        analysis = cls(ic_function, values, **kwargs, _blank_measures=True, _defer_potential=True)
+        if lazy_measures:
+            analysis._measures_file = h5py.File(path, "r")
+            analysis.measures = analysis._measures_file[cls.__name__]
+            # release the file if the analysis is dropped without closing it
+            weakref.finalize(analysis, analysis._measures_file.close)
+        with h5py.File(path, "r") as f:
+            if not lazy_measures:
+                analysis.measures = f[cls.__name__][()]
+            done_name = cls._done_dataset_name()
+            if done_name in f:
+                analysis.done = f[done_name][()]
+            else:
+                analysis.done[...] = True
+            if cls._orbits_dataset_name() in f:
+                # streamed by reevaluate rather than loaded
+                analysis._orbits_file = Path(path)
+            if "channels" in f[cls.__name__].attrs:
+                analysis.channel_names = [str(name) for name in f[cls.__name__].attrs["channels"]]
+        return analysis
+
+    def close(self) -> None:
+        """
+        Close the file of lazily read measures, loading the measures into memory.
+
+        Analyses read with lazy_measures can also be used in a `with` block, which closes
+        the file on exit.
+        """
+        if self._measures_file is None:
+            return
+        self.measures = self.measures[()]
+        self._measures_file.close()
+        self._measures_file = None
+
+    def __enter__(self) -> AnalysisBase:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @classmethod
+    def resume(cls, path: Any, backend_cls: Optional[Backend] = None, **kwargs) -> AnalysisBase:
+        """
+        Resume an analysis from its checkpoint file, computing only the missing grid points.
+
+        Args:
+            path: Path to the HDF5 checkpoint file.
+            backend_cls (Optional[Backend]): Backend class to use instead of the stored one.
+            **kwargs: Additional keyword arguments for the analysis, e.g. chunk sizes.
+
+        Returns:
+            AnalysisBase: Instance of AnalysisBase class with all measures computed.
+        """
+        ic_function, values, init_kwargs = cls._read_init_args(path, backend_cls)
+        return cls(ic_function, values, **init_kwargs, checkpoint=path, **kwargs)
+
+    @classmethod
+    def _read_init_args(
+        cls, path: Any, backend_cls: Optional[Backend] = None
+    ) -> tuple[Callable[..., c.SkyCoord], dict[str, Any], dict[str, Any]]:
+        """
+        Read the arguments to construct an analysis from an HDF5 file.
+
+        Args:
+            path: Path to the HDF5 file.
+            backend_cls (Optional[Backend]): Backend class to use instead of the stored one.
+
+        Returns:
+            Tuple[Callable[..., c.SkyCoord], Dict[str, Any], Dict[str, Any]]: The initial condition
+                function, its values, and keyword arguments for the analysis.
+        """
         with h5py.File(path, "r") as f:
             dset = f[cls.__name__]
 
@@ -274,6 +1672,7 @@ class AnalysisBase(MappingABC):
                 namespace: dict[str, Any] = {}
                 exec(icsource, {"u": u, "c": c}, namespace)
                 ic_function = namespace["ic_function"]
+                _READ_SOURCES[ic_function] = icsource
             else:
                 warnings.warn("No potential function defined.")
 
@@ -286,9 +1685,9 @@ class AnalysisBase(MappingABC):
             if "potfunc" in dset.attrs:
                 potsource = dset.attrs["potfunc"].tobytes().decode("utf8")
                 namespace = {}
-                print(potsource)
                 exec(potsource, {"u": u, "c": c}, namespace)
                 potential_function = namespace["potential_function"]
+                _READ_SOURCES[potential_function] = potsource
             else:
                 warnings.warn("No potential function defined.")
 
@@ -298,18 +1697,129 @@ class AnalysisBase(MappingABC):
             backend_cls = backend_cls or getattr(
                 pidgey, dset.attrs["backend"].tobytes().decode("utf8")
             )
-            analysis = cls(
-                ic_function,
-                values,
+            kwargs = dict(
                 potential_function=potential_function,
                 dt=dset.attrs["dt"],
                 steps=dset.attrs["steps"],
                 pattern_speed=dset.attrs["pattern_speed"],
-                backend=backend_cls(),
-                _blank_measures=True,
+                backend=backend_cls,
+                **cls._init_kwargs_from_attrs(dset.attrs),
             )
-            analysis.measures = dset[()]
-        return analysis
+            if cls._mask_dataset_name() in f:
+                kwargs["mask"] = f[cls._mask_dataset_name()][()]
+        return ic_function, values, kwargs
+
+
+def _function_source(function: Callable[..., Any], name: str) -> str:
+    """
+    Get the source of a function, renamed so that it defines `name` when executed.
+
+    Args:
+        function (Callable[..., Any]): Function defined in a source file, or read from an
+            analysis file.
+        name (str): Name to give the function.
+
+    Returns:
+        str: Dedented source of the function.
+    """
+    try:
+        return _READ_SOURCES[function]
+    except (KeyError, TypeError):
+        # not read from a file, or not weakly referenceable
+        pass
+    source = textwrap.dedent(inspect.getsource(function))
+    return source.replace(function.__name__, name, 1)
+
+
+def _plane_chunks(shape: tuple[int, ...], itemsize: int = 8) -> tuple[int, ...]:
+    """
+    Chunk shape holding one plane over the first two axes of an array, or a tile of it.
+
+    Planes larger than MAX_CHUNK_BYTES are halved along their longer axis until they fit,
+    as h5py does for its automatic chunk shapes.
+
+    Args:
+        shape (Tuple[int]): Shape of the array.
+        itemsize (int, optional): Size of an element, in bytes (default 8).
+
+    Returns:
+        Tuple[int]: Extent along the first two axes, and 1 along the others.
+    """
+    chunks = [max(n, 1) if axis < 2 else 1 for axis, n in enumerate(shape)]
+    while prod(chunks) * itemsize > MAX_CHUNK_BYTES:
+        axis = int(np.argmax(chunks[:2]))
+        chunks[axis] = ceil(chunks[axis] / 2)
+    return tuple(chunks)
+
+
+def _stored_unit(dset: h5py.Dataset) -> u.UnitBase:
+    """
+    Unit of the orbit positions stored in a dataset.
+
+    Args:
+        dset (h5py.Dataset): Dataset of stored orbits.
+
+    Returns:
+        u.UnitBase: Unit stored by `save`, kpc for files written before it was stored.
+    """
+    unit = dset.attrs.get("unit", "kpc")
+    return u.Unit(unit.decode("utf8") if isinstance(unit, bytes) else unit)
+
+
+def _plane_boxes(pixels: Sequence[tuple[int, ...]]) -> list[tuple[Any, ...]]:
+    """
+    Bounding boxes of grid points within each plane over the first two axes.
+
+    Writing a box touches a single chunk of datasets chunked by `_plane_chunks`, unlike
+    a block of rows, which spans every plane of grids with more than two dimensions.
+
+    Args:
+        pixels (Sequence[Tuple[int]]): Indices of the grid points.
+
+    Returns:
+        List[Tuple]: Index of each box, slices along the first two axes and integers along
+            the others.
+    """
+    planes: dict[tuple[int, ...], list[Any]] = {}
+    for pixel in pixels:
+        planes.setdefault(tuple(int(i) for i in pixel[2:]), []).append(pixel[:2])
+    boxes = []
+    for plane, indices in planes.items():
+        lower, upper = np.min(indices, axis=0), np.max(indices, axis=0)
+        boxes.append(tuple(slice(int(a), int(b) + 1) for a, b in zip(lower, upper)) + plane)
+    return boxes
+
+
+def _write_rows(dset: h5py.Dataset, rows: np.ndarray, values: np.ndarray) -> None:
+    """
+    Write values to rows of a dataset, with one write per run of consecutive rows.
+
+    Args:
+        dset (h5py.Dataset): Dataset to write to.
+        rows (np.ndarray): Sorted indices along the first axis of the dataset.
+        values (np.ndarray): Values of the rows, of shape (len(rows),) + dset.shape[1:].
+    """
+    for run in np.split(np.arange(len(rows)), np.flatnonzero(np.diff(rows) != 1) + 1):
+        dset[rows[run[0]] : rows[run[-1]] + 1] = values[run]
+
+
+def _differing_attrs(first: Mapping[str, Any], second: Mapping[str, Any]) -> list[str]:
+    """
+    Find the HDF5 attributes differing between two sets.
+
+    Args:
+        first (Mapping[str, Any]): First attributes.
+        second (Mapping[str, Any]): Second attributes.
+
+    Returns:
+        List[str]: Names of the attributes missing from either set or with different values.
+    """
+    names = sorted(set(first) | set(second))
+    return [
+        attr
+        for attr in names
+        if attr not in first or attr not in second or not np.array_equal(first[attr], second[attr])
+    ]
 
 
 class MPAnalysisBase(AnalysisBase):
@@ -331,6 +1841,18 @@ class MPAnalysisBase(AnalysisBase):
         steps (int): Number of integration steps.
         pattern_speed (u.Quantity): Pattern speed for orbit integration.
         measures (np.ndarray): Array to store orbit measures.
+        done (np.ndarray): Boolean array marking the grid points whose measures are computed.
+        checkpoint (Optional[Path]): HDF5 file where completed chunks are written.
+        pidgey_chunksize (int): Chunk size for orbit integration.
+        lazy (bool): Whether measures are computed only when accessed.
+        mask (np.ndarray): Boolean array of the grid points to compute; the others are NaN.
+        callback (Optional[Callable]): Function called with each completed chunk.
+        executor (Optional[Executor]): Executor evaluating orbits.
+        shard (Optional[Tuple[int, int]]): Index and count of the shard of the grid to compute.
+        mp_chunksize (int): Chunk size for orbit evaluation in worker processes.
+        processes (Optional[int]): Number of worker processes.
+        pipeline_depth (int): Number of chunks evaluated while integrating the next.
+        integrate_in_workers (bool): Whether worker processes also integrate the orbits.
     """
 
     @staticmethod
@@ -338,6 +1860,12 @@ class MPAnalysisBase(AnalysisBase):
     def __eval__(orbit: c.SkyCoord) -> float:
         return 0.0
 
+    def _evaluator(self) -> Callable[[c.SkyCoord], Any]:
+        # worker processes receive this function, so it must be picklable
+        if self.channels is not None:
+            return self.channels
+        return self.__eval__
+
     def __init__(
         self,
         ic_function: Callable[..., c.SkyCoord],
@@ -348,12 +1876,42 @@ class MPAnalysisBase(AnalysisBase):
         steps: Union[int, np.ndarray],
         *,
         pattern_speed: Union[float, u.Quantity] = 0.0,
-        backend: Optional[Union[str, Backend]] = None,
+        backend: Optional[Union[str, Backend, type[Backend]]] = None,
         progressbar: bool = True,
         pidgey_chunksize: Optional[int] = None,
+        vectorized_ic: Optional[bool] = None,
+        checkpoint: Optional[Any] = None,
         mp_chunksize: Optional[int] = None,
+        processes: Optional[int] = None,
+        pipeline_depth: int = 0,
+        integrate_in_workers: bool = False,
+        lazy: bool = False,
+        mask: Optional[Union[np.ndarray, Callable[..., Any]]] = None,
+        callback: Optional[Callable[[list[tuple[int, ...]], np.ndarray], Any]] = None,
+        executor: Optional[Executor] = None,
+        shard: Optional[tuple[int, int]] = None,
+        orbit_cache: Optional[Any] = None,
+        store_orbits: bool = False,
+        evaluators: Optional[Union[Sequence[Callable], Mapping[str, Callable]]] = None,
+        autotune: bool = False,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
         _blank_measures: bool = False,
+        _defer_potential: bool = False,
     ) -> None:
+        """
+        Initialize MPAnalysisBase instance.
+
+        Takes the arguments of AnalysisBase, and the following. If an executor is given, it
+        is used instead of a pool of worker processes, with the same scheduling options.
+
+        Args:
+            mp_chunksize (Optional[int], optional): Chunk size for batching orbit evaluation in
+                workers (default square root of pidgey_chunksize).
+            processes (Optional[int], optional): Number of worker processes (default os.cpu_count()).
+            pipeline_depth (int, optional): Number of chunks evaluated while integrating the next (default 0).
+            integrate_in_workers (bool, optional): Whether worker processes also integrate the
+                orbits (default False).
+        """
         super().__init__(
             ic_function,
             values,
@@ -364,7 +1922,19 @@ class MPAnalysisBase(AnalysisBase):
             backend=backend,
             progressbar=progressbar,
             pidgey_chunksize=pidgey_chunksize,
+            vectorized_ic=vectorized_ic,
+            checkpoint=checkpoint,
+            lazy=lazy,
+            mask=mask,
+            callback=callback,
+            executor=executor,
+            shard=shard,
+            orbit_cache=orbit_cache,
+            store_orbits=store_orbits,
+            evaluators=evaluators,
             _blank_measures=True,
+            memory_budget=memory_budget,
+            _defer_potential=_defer_potential,
         )
         if pidgey_chunksize is None:
             # set default chunk size for pidgey if not provided
@@ -383,52 +1953,211 @@ class MPAnalysisBase(AnalysisBase):
         if mp_chunksize > pidgey_chunksize:
             raise ValueError("mp_chunksize must not be greater than pidgey_chunksize")
 
-        if not _blank_measures:
-            self._construct_image_with_mp(pidgey_chunksize, mp_chunksize, progressbar)
+        if processes is not None and processes <= 0:
+            raise ValueError("processes must be greater than 0")
+        if pipeline_depth < 0:
+            raise ValueError("pipeline_depth must not be negative")
+        if store_orbits and integrate_in_workers:
+            raise ValueError("store_orbits requires orbits integrated in this process")
+
+        self.mp_chunksize = mp_chunksize
+        self.processes = processes
+        self.pipeline_depth = pipeline_depth
+        self.integrate_in_workers = integrate_in_workers
+
+        if _blank_measures or lazy:
+            return
+        if autotune:
+            self.autotune(progressbar)
+        with self._checkpointing():
+            self._compute_selection(None, progressbar)
+
+    def _tune_task_size(self, seconds_per_orbit: float) -> dict[str, Any]:
+        # tasks long enough to amortize sending them to workers, and enough of them per
+        # chunk to keep every worker busy
+        processes = self.processes or os.cpu_count() or 1
+        most = max(self.pidgey_chunksize // (4 * processes), 1)
+        wanted = ceil(TARGET_TASK_SECONDS / seconds_per_orbit) if seconds_per_orbit > 0 else most
+        self.mp_chunksize = max(min(wanted, most), 1)
+        return {"mp_chunksize": self.mp_chunksize}
+
+    def _iter_selection(
+        self, selection: Optional[np.ndarray], progressbar: bool
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        if self.executor is not None or (
+            selection is not None
+            and self._pending_chunk_count(self.pidgey_chunksize, selection) <= 1
+        ):
+            # a single chunk is not worth starting worker processes for
+            yield from super()._iter_selection(selection, progressbar)
+        elif self.integrate_in_workers:
+            yield from self._construct_image_in_workers(
+                self.pidgey_chunksize, progressbar, self.processes, selection
+            )
+        else:
+            yield from self._construct_image_with_mp(
+                self.pidgey_chunksize,
+                self.mp_chunksize,
+                progressbar,
+                self.processes,
+                self.pipeline_depth,
+                selection,
+            )
+
+    def _executor_options(self) -> tuple[int, int, bool]:
+        return self.mp_chunksize, self.pipeline_depth, self.integrate_in_workers
 
     def _construct_image_with_mp(
-        self, pidgey_chunksize: int = 1, mp_chunksize: int = 1, progressbar: bool = True
-    ):
-        for pixels in tqdm(
-            chunked(np.ndindex(self.shape), pidgey_chunksize),
-            desc=f"with {pidgey_chunksize=}",
-            total=self.size // pidgey_chunksize,
-            disable=not progressbar,
-        ):
-            coords = []
-            for pixel in pixels:
-                params = [self.ic_values[ax][i] for i, ax in zip(pixel, self.axis_names)]
-                coord = self.ic_function(*params)
-                coords.append(coord)
-            coords = collapse_coords(coords)
-
-            # NOTE: causes weird behavior when velocities are all set to 0
-            # params = np.array(
-            #     [
-            #         [self.ic_values[ax][i] for i, ax in zip(pixel, self.axis_names)]
-            #         for pixel in pixels
-            #     ]
-            # )
-            # coords = self.ic_function(*params.T)
-
-            orbits = self.backend.compute_orbit(
-                coords,
-                self.potential,
-                self.dt,
-                self.steps,
-                pattern_speed=self.pattern_speed,
+        self,
+        pidgey_chunksize: int = 1,
+        mp_chunksize: int = 1,
+        progressbar: bool = True,
+        processes: Optional[int] = None,
+        pipeline_depth: int = 0,
+        selection: Optional[np.ndarray] = None,
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        """
+        Construct an image of a slice of phase space, evaluating orbits in a pool of worker processes.
+
+        A single pool is used for every chunk, and is terminated if construction
+        fails or is interrupted. With a positive pipeline depth, the next chunk is
+        integrated while workers evaluate up to `pipeline_depth` earlier chunks.
+
+        Args:
+            pidgey_chunksize (int, optional): Chunk size for batching orbit integration (default 1).
+            mp_chunksize (int, optional): Chunk size for batching orbit evaluation in workers (default 1).
+            progressbar (bool, optional): Whether to show progress bar during construction (default True).
+            processes (Optional[int], optional): Number of worker processes (default os.cpu_count()).
+            pipeline_depth (int, optional): Number of chunks evaluated while integrating the next (default 0).
+            selection (Optional[np.ndarray], optional): Boolean array of the grid points to compute
+                (default None, the whole grid).
+
+        Yields:
+            Tuple[List[Tuple[int]], Sequence[Any]]: The grid points of a chunk and their measures.
+        """
+        with worker_pool(processes, self._evaluator()) as pool:
+            yield from self._evaluate_chunks_in_pool(
+                pool, pidgey_chunksize, mp_chunksize, progressbar, pipeline_depth, selection
             )
-            with Pool() as p:
-                values = tuple(
-                    tqdm(
-                        p.imap(self.__eval__, orbits, chunksize=mp_chunksize),
-                        desc=f"with {mp_chunksize=}",
-                        total=pidgey_chunksize,
-                        leave=False,
-                    )
-                )
-            for pixel, value in zip(pixels, values):
-                self.measures[pixel] = value
+
+    def _construct_image_in_workers(
+        self,
+        pidgey_chunksize: int = 1,
+        progressbar: bool = True,
+        processes: Optional[int] = None,
+        selection: Optional[np.ndarray] = None,
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        """
+        Construct an image of a slice of phase space, integrating and evaluating orbits in worker processes.
+
+        Each worker builds the potential once, then integrates and evaluates whole
+        chunks of pixels, returning only their measures.
+
+        Args:
+            pidgey_chunksize (int, optional): Chunk size for batching orbit integration (default 1).
+            progressbar (bool, optional): Whether to show progress bar during construction (default True).
+            processes (Optional[int], optional): Number of worker processes (default os.cpu_count()).
+            selection (Optional[np.ndarray], optional): Boolean array of the grid points to compute
+                (default None, the whole grid).
+
+        Yields:
+            Tuple[List[Tuple[int]], Sequence[Any]]: The grid points of a chunk and their measures,
+                in the order workers complete them.
+        """
+        chunks = list(self._pending_chunks(pidgey_chunksize, selection))
+        if not chunks:
+            return
+        several = [chunk for chunk in chunks if len(chunk) > 1]
+        if self.vectorized_ic is None and several:
+            # detect once here rather than in every worker
+            self._initial_conditions(several[0])
+        # workers rebuild the potential and do not need the measures or checkpoint file
+        with worker_pool(processes, self._evaluator(), self._task_copy()) as pool:
+            for pixels, values in tqdm(
+                pool.imap_unordered(integrate_and_evaluate, chunks),
+                desc=f"with {pidgey_chunksize=} in workers",
+                total=len(chunks),
+                disable=not progressbar,
+            ):
+                self._store_chunk(pixels, values)
+                yield pixels, values
+
+    def _evaluate_chunks_in_pool(
+        self,
+        pool: Pool,
+        pidgey_chunksize: int,
+        mp_chunksize: int,
+        progressbar: bool,
+        pipeline_depth: int = 0,
+        selection: Optional[np.ndarray] = None,
+    ) -> Iterator[tuple[list[tuple[int, ...]], Sequence[Any]]]:
+        # chunks submitted to the pool and not yet collected, oldest first
+        pending: deque[tuple[list[tuple[int, ...]], ExitStack, IMapIterator]] = deque()
+        try:
+            for pixels in tqdm(
+                self._pending_chunks(pidgey_chunksize, selection),
+                desc=f"with {pidgey_chunksize=}",
+                total=self._pending_chunk_count(pidgey_chunksize, selection),
+                disable=not progressbar,
+            ):
+                # workers evaluate earlier chunks in the background while this one integrates
+                orbits = self._integrate_chunk(pixels)
+                with ExitStack() as stack:
+                    func, tasks = stack.enter_context(self._share_orbits(orbits))
+                    results = pool.imap_unordered(func, tasks, chunksize=mp_chunksize)
+                    # keep shared orbits alive until the chunk is collected
+                    pending.append((pixels, stack.pop_all(), results))
+                while len(pending) > pipeline_depth:
+                    yield self._collect_chunk(*pending.popleft(), pidgey_chunksize, mp_chunksize)
+            while pending:
+                yield self._collect_chunk(*pending.popleft(), pidgey_chunksize, mp_chunksize)
+        finally:
+            for _, stack, _ in pending:
+                stack.close()
+
+    def _collect_chunk(
+        self,
+        pixels: list[tuple[int, ...]],
+        stack: ExitStack,
+        results: IMapIterator,
+        pidgey_chunksize: int,
+        mp_chunksize: int,
+    ) -> tuple[list[tuple[int, ...]], Sequence[Any]]:
+        values: list[Any] = [None] * len(pixels)
+        with stack:
+            # results arrive as workers complete them, tagged with their index in the chunk
+            for index, value in tqdm(
+                results,
+                desc=f"with {mp_chunksize=}",
+                total=len(pixels),
+                leave=False,
+            ):
+                values[index] = value
+        self._store_chunk(pixels, values)
+        return pixels, values
+
+    @staticmethod
+    @contextmanager
+    def _share_orbits(orbits: Any) -> Iterator[tuple[Callable[[Any], Any], Iterable[Any]]]:
+        """
+        Prepare integrated orbits for evaluation in worker processes.
+
+        Cartesian orbit positions are written once into a shared memory block,
+        so workers only receive the block name and an orbit index. Other orbit
+        types are pickled and sent to the workers along with their index. Either
+        way, the worker function returns the index of the orbit with its measure.
+
+        Args:
+            orbits: Integrated orbits from the backend.
+
+        Yields:
+            Tuple[Callable, Iterable]: Worker function and the tasks to map it over.
+        """
+        if not isinstance(orbits, c.CartesianRepresentation):
+            yield evaluate_indexed_orbit, enumerate(orbits)
+            return
+        with SharedOrbits.from_orbits(orbits) as block:
+            yield evaluate_shared_orbit, [(block, i) for i in range(len(block))]
 
 
 class AnalysisBase2D(MPAnalysisBase):
@@ -508,13 +2237,160 @@ class AnalysisBase3D(MPAnalysisBase):
 # define user-facing analysis classes
 from .tessellation import Tessellation
 from .tessellation.base import TessellationBase
+from .tessellation.dim2 import Tessellation2D
+from .tessellation.dim3 import Tessellation3D
 
 
-class TessellationAnalysis(AnalysisBase3D):
+class TessellationSweep:
+    """
+    Picklable orbit evaluator computing tessellation measures for several tessellation parameters.
+
+    Measures are returned with shape (len(axis_ratios), len(normalization_routines)),
+    leaving out the axis of any parameter that is not swept.
+
+    Attributes:
+        evaluate (Callable[[c.SkyCoord], TessellationBase]): Function producing the tessellation of an orbit.
+        axis_ratios (Optional[np.ndarray]): Thresholds for tessellation trimming.
+        normalization_routines (Optional[list[str]]): Normalization routines.
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[c.SkyCoord], TessellationBase],
+        axis_ratios: Optional[np.ndarray] = None,
+        normalization_routines: Optional[list[str]] = None,
+    ) -> None:
+        self.evaluate = evaluate
+        self.axis_ratios = axis_ratios
+        self.normalization_routines = normalization_routines
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        shape: tuple[int, ...] = ()
+        if self.axis_ratios is not None:
+            shape += (len(self.axis_ratios),)
+        if self.normalization_routines is not None:
+            shape += (len(self.normalization_routines),)
+        return shape
+
+    def __call__(self, orbit: c.SkyCoord) -> np.ndarray:
+        tess = self.evaluate(orbit)
+        if self.axis_ratios is None:
+            measures = tess.measures_for_normalizations(self.normalization_routines)
+            return np.array(list(measures.values()))
+        if self.normalization_routines is None:
+            return tess.measures_for_axis_ratios(self.axis_ratios)
+        if tess.mask is None:
+            # degenerate tessellation, the measure is 0 for any parameters
+            return np.zeros(self.shape)
+        trimmed = tess.measures_for_axis_ratios(self.axis_ratios) * tess.normalization_const
+        consts = tess.normalization_consts(self.normalization_routines)
+        return np.divide.outer(trimmed, [consts[r] for r in self.normalization_routines])
+
+
+class TessellationAnalysisMixin:
+    """
+    Mixin for tessellation analysis classes, adding measure sweeps over tessellation parameters.
+
+    Passing `axis_ratios` and/or `normalization_routines` computes one measure
+    per parameter value from a single tessellation of each orbit. The measures
+    array then gains a trailing axis for each swept parameter, in that order.
+    Setting `normalization_routines="all"` uses every registered routine.
+
+    Passing `refinement_levels` computes measures adaptively with `refine`, on a
+    coarse grid refined only where measures change by more than `refinement_threshold`.
+
+    Attributes:
+        axis_ratios (Optional[np.ndarray]): Thresholds for tessellation trimming (default None).
+        normalization_routines (Optional[list[str]]): Normalization routines (default None).
+    """
+
+    tessellation_class: type[TessellationBase]
+    evaluate: Callable[[c.SkyCoord], TessellationBase]
+
+    def __init__(
+        self,
+        *args,
+        axis_ratios: Optional[Sequence[float]] = None,
+        normalization_routines: Optional[Union[str, Sequence[str]]] = None,
+        refinement_levels: Optional[int] = None,
+        refinement_threshold: float = 0.05,
+        **kwargs,
+    ) -> None:
+        self.axis_ratios = None
+        if axis_ratios is not None:
+            self.axis_ratios = np.asarray(axis_ratios, dtype=float).reshape(-1)
+        if isinstance(normalization_routines, str):
+            if normalization_routines == "all":
+                normalization_routines = self.tessellation_class.normalization_routines()
+            else:
+                normalization_routines = [normalization_routines]
+        self.normalization_routines = None
+        if normalization_routines is not None:
+            self.normalization_routines = [str(routine) for routine in normalization_routines]
+            available = self.tessellation_class._registered_normalizations()
+            for routine in self.normalization_routines:
+                if routine not in available:
+                    raise ValueError(
+                        f"Unrecognized normalization routine {routine}. "
+                        f"Available normalizations are {list(available)}"
+                    )
+        if kwargs.get("evaluators") is not None and (
+            self.axis_ratios is not None or self.normalization_routines is not None
+        ):
+            raise ValueError("evaluators cannot be combined with tessellation parameter sweeps")
+        if refinement_levels is None:
+            super().__init__(*args, **kwargs)
+            return
+        progressbar = kwargs.get("progressbar", True)
+        blank = kwargs.get("_blank_measures", False)
+        # skip computing the whole grid, then restore the caller's setting after refinement
+        super().__init__(*args, **{**kwargs, "lazy": True})
+        if not blank:
+            self.refine(refinement_levels, refinement_threshold, progressbar)  # type: ignore[attr-defined]
+        self.lazy = kwargs.get("lazy", False)
+
+    def _sweep(self) -> Optional[TessellationSweep]:
+        if self.axis_ratios is None and self.normalization_routines is None:
+            return None
+        return TessellationSweep(self.evaluate, self.axis_ratios, self.normalization_routines)
+
+    def _channel_shape(self) -> tuple[int, ...]:
+        sweep = self._sweep()
+        if sweep is None:
+            return super()._channel_shape()  # type: ignore[misc]
+        return sweep.shape
+
+    def _evaluator(self) -> Callable[[c.SkyCoord], Any]:
+        sweep = self._sweep()
+        if sweep is None:
+            return super()._evaluator()  # type: ignore[misc]
+        return sweep
+
+    def _extra_attrs(self) -> dict[str, Any]:
+        attrs = super()._extra_attrs()  # type: ignore[misc]
+        if self.axis_ratios is not None:
+            attrs["axis_ratios"] = self.axis_ratios
+        if self.normalization_routines is not None:
+            attrs["normalization_routines"] = self.normalization_routines
+        return attrs
+
+    @classmethod
+    def _init_kwargs_from_attrs(cls, attrs: Mapping[str, Any]) -> dict[str, Any]:
+        kwargs = super()._init_kwargs_from_attrs(attrs)  # type: ignore[misc]
+        if "axis_ratios" in attrs:
+            kwargs["axis_ratios"] = attrs["axis_ratios"]
+        if "normalization_routines" in attrs:
+            kwargs["normalization_routines"] = list(attrs["normalization_routines"])
+        return kwargs
+
+
+class TessellationAnalysis(TessellationAnalysisMixin, AnalysisBase3D):
     """
     Analysis class for tessellation analysis on 3D orbits.
 
     This class extends AnalysisBase3D and implements the evaluate method for tessellation analysis.
+    Measure sweeps over tessellation parameters are provided by TessellationAnalysisMixin.
 
     Attributes:
         ic_function (Callable[..., c.SkyCoord]): Function to generate initial conditions for orbits.
@@ -527,8 +2403,12 @@ class TessellationAnalysis(AnalysisBase3D):
         steps (int): Number of integration steps.
         pattern_speed (u.Quantity): Pattern speed for orbit integration.
         measures (np.ndarray): Array to store orbit measures.
+        axis_ratios (Optional[np.ndarray]): Thresholds for tessellation trimming (default None).
+        normalization_routines (Optional[list[str]]): Normalization routines (default None).
     """
 
+    tessellation_class = Tessellation3D
+
     @staticmethod
     def evaluate(orbit: c.SkyCoord) -> TessellationBase:
         """
@@ -547,11 +2427,12 @@ class TessellationAnalysis(AnalysisBase3D):
         return Tessellation(orbit, incremental=False).measure
 
 
-class TessellationAnalysis2D(AnalysisBase2D):
+class TessellationAnalysis2D(TessellationAnalysisMixin, AnalysisBase2D):
     """
     Analysis class for tessellation analysis on 2D orbits.
 
     This class extends AnalysisBase2D and implements the evaluate method for tessellation analysis.
+    Measure sweeps over tessellation parameters are provided by TessellationAnalysisMixin.
 
     Attributes:
         ic_function (Callable[..., c.SkyCoord]): Function to generate initial conditions for orbits.
@@ -564,8 +2445,12 @@ class TessellationAnalysis2D(AnalysisBase2D):
         steps (int): Number of integration steps.
         pattern_speed (u.Quantity): Pattern speed for orbit integration.
         measures (np.ndarray): Array to store orbit measures.
+        axis_ratios (Optional[np.ndarray]): Thresholds for tessellation trimming (default None).
+        normalization_routines (Optional[list[str]]): Normalization routines (default None).
     """
 
+    tessellation_class = Tessellation2D
+
     @staticmethod
     def evaluate(orbit) -> TessellationBase:
         """
@@ -0,0 +1,187 @@
+"""
+This module defines an on-disk cache of integrated orbits, shared by
+analyses integrating the same orbits in the same potential.
+
+Entries are content-addressed: each orbit is stored under a hash of
+everything its integration depends on, so that analyses only differing in
+how orbits are evaluated reuse each other's orbits without integrating them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import astropy.coordinates as c
+import astropy.units as u
+import numpy as np
+
+# default size cap of the cache directory, in bytes
+DEFAULT_MAX_BYTES = 2**30
+
+# fraction of the size cap the cache is shrunk to once full, so that the directory is
+# scanned once per many entries stored rather than on every one
+EVICTION_LOW_WATER = 0.9
+
+
+class OrbitCache:
+    """
+    Directory of integrated orbit positions with a size cap and least recently used eviction.
+
+    Each entry is a .npy file of shape (steps, 3) holding the Cartesian positions
+    of an orbit in kpc, named after its key. Dimensionless positions, as returned
+    by backends integrating in natural units such as agama, are taken to be in kpc. Entries are written atomically, so
+    several processes can share a cache directory; the size cap is then only
+    enforced approximately, by each process on the entries it knows of.
+
+    Attributes:
+        directory (Path): Directory holding the entries.
+        max_bytes (int): Size cap of the entries, in bytes.
+    """
+
+    def __init__(self, directory: Any, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initialize OrbitCache instance, creating its directory if needed.
+
+        Args:
+            directory: Path to the directory holding the entries.
+            max_bytes (int, optional): Size cap of the entries, in bytes (default 1 GiB).
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than 0")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the size is recounted by each process using the cache
+        return {"directory": self.directory, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["directory"], state["max_bytes"])  # type: ignore[misc]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the entries known to this process, in bytes.
+        """
+        return self._size
+
+    def keys(self, integration: str, ics: c.SkyCoord) -> list[str]:
+        """
+        Compute the keys of the orbits integrated from initial conditions.
+
+        Args:
+            integration (str): Digest of the integration settings, from `integration_digest`.
+            ics (c.SkyCoord): Initial conditions of shape (n,).
+
+        Returns:
+            List[str]: Key of each orbit.
+        """
+        prefix = hashlib.sha256(integration.encode("utf8"))
+        prefix.update(repr(ics.replicate_without_data()).encode("utf8"))
+        positions = ics.cartesian.xyz.to_value(u.kpc).reshape(3, -1)
+        velocities = ics.velocity.d_xyz.to_value(u.km / u.s).reshape(3, -1)
+        keys = []
+        for position, velocity in zip(positions.T, velocities.T):
+            digest = prefix.copy()
+            digest.update(np.ascontiguousarray(position, dtype=float).tobytes())
+            digest.update(np.ascontiguousarray(velocity, dtype=float).tobytes())
+            keys.append(digest.hexdigest())
+        return keys
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Get the positions of a cached orbit, marking it as recently used.
+
+        Args:
+            key (str): Key of the orbit.
+
+        Returns:
+            Optional[np.ndarray]: Positions of shape (steps, 3) in kpc, or None if not cached.
+        """
+        path = self._path(key)
+        try:
+            positions = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            # missing, evicted by another process, or partially written
+            return None
+        return positions
+
+    def put(self, key: str, positions: np.ndarray) -> None:
+        """
+        Store the positions of an orbit, evicting least recently used entries above the size cap.
+
+        Once the cap is exceeded, the cache is shrunk to EVICTION_LOW_WATER of it.
+
+        Args:
+            key (str): Key of the orbit.
+            positions (np.ndarray): Positions of shape (steps, 3) in kpc.
+        """
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(positions, dtype=float))
+        replaced = path.stat().st_size if path.exists() else 0
+        os.replace(tmp, path)
+        self._size += path.stat().st_size - replaced
+        if self._size > self.max_bytes:
+            self.evict(int(self.max_bytes * EVICTION_LOW_WATER))
+
+    def evict(self, max_bytes: int = 0) -> None:
+        """
+        Remove least recently used entries until their total size is at most max_bytes.
+
+        Args:
+            max_bytes (int, optional): Size to shrink the cache to, in bytes (default 0, emptying it).
+        """
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat(), entry))
+            except OSError:
+                continue
+        entries.sort(key=lambda item: item[0].st_mtime_ns)
+        self._size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if self._size <= max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            self._size -= stat.st_size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def _entries(self) -> Iterable[Path]:
+        return self.directory.glob("*.npy")
+
+
+def integration_digest(
+    potential_source: str, dt: u.Quantity, steps: Any, pattern_speed: u.Quantity, backend_cls: type
+) -> str:
+    """
+    Hash the settings orbit integration depends on, besides initial conditions.
+
+    Args:
+        potential_source (str): Source of the potential function.
+        dt (u.Quantity): Time step for orbit integration.
+        steps: Number of integration steps.
+        pattern_speed (u.Quantity): Pattern speed for orbit integration.
+        backend_cls (type): Class of the backend for orbit computation.
+
+    Returns:
+        str: Hexadecimal digest of the settings.
+    """
+    digest = hashlib.sha256(potential_source.encode("utf8"))
+    for value in (dt.to_value(u.Gyr), steps, pattern_speed.to_value(u.km / u.s / u.kpc)):
+        digest.update(np.asarray(value, dtype=float).tobytes())
+    digest.update(f"{backend_cls.__module__}.{backend_cls.__qualname__}".encode("utf8"))
+    return digest.hexdigest()
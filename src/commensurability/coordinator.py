@@ -0,0 +1,253 @@
+"""
+This module defines a coordinator distributing the chunks of an analysis grid
+to worker processes over TCP, for clusters without a shared scheduler.
+
+The coordinator owns the analysis: it hands out chunks of pending grid points,
+stores the returned measures (writing them to the analysis checkpoint file, if
+any), and re-queues the chunks of workers that disconnect or time out. Workers
+can run on any host reaching the coordinator, each with its own copy of the
+analysis, typically built by the same script with `lazy=True`. Workers whose
+analysis differs in its grid, integration or evaluation settings are rejected.
+
+Messages are pickled, so the coordinator and workers authenticate each other
+with a shared key.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Optional
+
+from .workers import integrate_and_evaluate_with
+
+
+class Coordinator:
+    """
+    TCP work queue handing out the chunks of an analysis grid to workers.
+
+    Attributes:
+        analysis (AnalysisBase): Analysis whose pending grid points are computed.
+        address (Tuple[str, int]): Address workers connect to.
+        chunksize (int): Number of grid points per chunk.
+        lease_timeout (Optional[float]): Seconds after which a chunk is handed out again.
+    """
+
+    def __init__(
+        self,
+        analysis: Any,
+        address: tuple[str, int] = ("localhost", 0),
+        *,
+        authkey: bytes,
+        chunksize: Optional[int] = None,
+        lease_timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize Coordinator instance, listening for workers.
+
+        Args:
+            analysis (AnalysisBase): Analysis whose pending grid points are computed.
+            address (Tuple[str, int], optional): Address to listen on; port 0 picks a free
+                port (default ("localhost", 0)).
+            authkey (bytes): Key shared with the workers.
+            chunksize (Optional[int], optional): Number of grid points per chunk
+                (default the analysis' pidgey_chunksize).
+            lease_timeout (Optional[float], optional): Seconds after which the chunk of an
+                unresponsive worker is handed out again (default None, only on disconnection).
+        """
+        self.analysis = analysis
+        self.chunksize = chunksize or analysis.pidgey_chunksize
+        if self.chunksize <= 0:
+            raise ValueError("chunksize must be greater than 0")
+        if lease_timeout is not None and lease_timeout <= 0:
+            raise ValueError("lease_timeout must be greater than 0")
+        self.lease_timeout = lease_timeout
+        self._authkey = authkey
+        self._listener = Listener(address, authkey=authkey)
+        self.address: tuple[str, int] = self._listener.address  # type: ignore[assignment]
+
+        self._condition = threading.Condition()
+        self._chunks: dict[int, list[tuple[int, ...]]] = {}
+        self._queue: deque[int] = deque()
+        # chunks handed out and not yet returned, with their deadline
+        self._leases: dict[int, float] = {}
+        self._completed: set[int] = set()
+        self._error: Optional[str] = None
+        self._finished = False
+        # workers must compute measures with the same settings
+        self._digest = analysis._settings_digest()
+
+    def run(self, path: Optional[Any] = None) -> Any:
+        """
+        Serve chunks to workers until every pending grid point is computed.
+
+        Args:
+            path (Optional[Any], optional): Path to save the analysis to once done (default None).
+
+        Returns:
+            AnalysisBase: The analysis with its measures computed.
+        """
+        for chunk_id, pixels in enumerate(self.analysis._pending_chunks(self.chunksize)):
+            self._chunks[chunk_id] = pixels
+            self._queue.append(chunk_id)
+        try:
+            with self.analysis._checkpointing():
+                accepting = threading.Thread(target=self._accept, daemon=True)
+                accepting.start()
+                with self._condition:
+                    while (self._queue or self._leases) and self._error is None:
+                        self._condition.wait(timeout=0.1)
+                        self._expire_leases()
+                    self._finished = True
+                    self._condition.notify_all()
+        finally:
+            self._close()
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        if path is not None:
+            self.analysis.save(path)
+        return self.analysis
+
+    def _close(self) -> None:
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+        # wake the accepting thread up so that it sees the coordinator is finished
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except Exception:
+            pass
+        self._listener.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                # closed listener, or a client failing authentication
+                if self._finished:
+                    return
+                continue
+            if self._finished:
+                conn.close()
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            try:
+                if not self._welcome(conn):
+                    return
+                while True:
+                    lease = self._next_chunk()
+                    if lease is None:
+                        conn.send(("done",))
+                        return
+                    chunk_id, pixels = lease
+                    try:
+                        conn.send(("chunk", chunk_id, pixels))
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        self._requeue(chunk_id)
+                        return
+                    if message[0] == "result":
+                        self._complete(chunk_id, message[2])
+                    else:
+                        self._fail(f"Worker failed to evaluate a chunk:\n{message[2]}")
+                        return
+            except (EOFError, OSError):
+                return
+
+    def _welcome(self, conn: Connection) -> bool:
+        _, name, digest = conn.recv()
+        if name != type(self.analysis).__name__:
+            conn.send(("reject", f"expected {type(self.analysis).__name__}, got {name}"))
+            return False
+        if digest != self._digest:
+            conn.send(("reject", "grid, integration or evaluation settings differ"))
+            return False
+        conn.send(("welcome",))
+        return True
+
+    def _next_chunk(self) -> Optional[tuple[int, list[tuple[int, ...]]]]:
+        with self._condition:
+            if self._error is not None:
+                return None
+            while not self._queue:
+                if self._finished or not self._leases:
+                    return None
+                self._condition.wait(timeout=0.1)
+                self._expire_leases()
+            chunk_id = self._queue.popleft()
+            self._leases[chunk_id] = time.monotonic() + (self.lease_timeout or float("inf"))
+            return chunk_id, self._chunks[chunk_id]
+
+    def _expire_leases(self) -> None:
+        now = time.monotonic()
+        for chunk_id, deadline in list(self._leases.items()):
+            if deadline < now:
+                self._requeue(chunk_id)
+
+    def _requeue(self, chunk_id: int) -> None:
+        with self._condition:
+            if self._leases.pop(chunk_id, None) is not None:
+                self._queue.append(chunk_id)
+                self._condition.notify_all()
+
+    def _complete(self, chunk_id: int, values: list[Any]) -> None:
+        with self._condition:
+            if chunk_id in self._completed:
+                # handed out again after a timeout, and completed elsewhere first
+                return
+            try:
+                self.analysis._store_chunk(self._chunks[chunk_id], values)
+            except Exception:
+                self._fail(f"Failed to store the measures of a chunk:\n{traceback.format_exc()}")
+                return
+            self._completed.add(chunk_id)
+            if self._leases.pop(chunk_id, None) is None:
+                # re-queued after a timeout, and completed by the late worker
+                self._queue.remove(chunk_id)
+            self._condition.notify_all()
+
+    def _fail(self, error: str) -> None:
+        with self._condition:
+            self._error = error
+            self._condition.notify_all()
+
+
+def run_worker(analysis: Any, address: tuple[str, int], *, authkey: bytes) -> int:
+    """
+    Compute chunks handed out by a coordinator until it has none left.
+
+    Args:
+        analysis (AnalysisBase): Analysis matching the coordinator's, used to integrate
+            and evaluate orbits.
+        address (Tuple[str, int]): Address of the coordinator.
+        authkey (bytes): Key shared with the coordinator.
+
+    Returns:
+        int: Number of chunks computed by this worker.
+    """
+    evaluator = analysis._evaluator()
+    with Client(address, authkey=authkey) as conn:
+        conn.send(("hello", type(analysis).__name__, analysis._settings_digest()))
+        reply = conn.recv()
+        if reply[0] == "reject":
+            raise RuntimeError(f"Coordinator rejected this worker: {reply[1]}")
+        count = 0
+        while True:
+            message = conn.recv()
+            if message[0] == "done":
+                return count
+            _, chunk_id, pixels = message
+            try:
+                values = integrate_and_evaluate_with(analysis, evaluator, pixels)
+            except Exception:
+                conn.send(("error", chunk_id, traceback.format_exc()))
+                raise
+            conn.send(("result", chunk_id, values))
+            count += 1
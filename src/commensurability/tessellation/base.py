@@ -8,7 +8,7 @@ from __future__ import annotations
 import warnings
 from abc import abstractmethod
 from collections import defaultdict
-from typing import Any, Callable, Mapping, Optional, Union
+from typing import Any, Callable, Hashable, Mapping, Optional, Sequence, Union
 
 import numpy as np
 from scipy import spatial
@@ -44,6 +44,7 @@ class TessellationBase(Evaluation):
     __slots__ = (
         "points",
         "_normalizations",
+        "_shared",
         "tri",
         "tracers",
         "mask",
@@ -75,6 +76,7 @@ class TessellationBase(Evaluation):
         """
         self.points: np.ndarray = points
         self._normalizations: Mapping[str, Callable]
+        self._shared: dict[Hashable, Any] = {}
         self.tri: Union[spatial.Delaunay, FailedDelaunay]
         self.tracers: Mapping[str, np.ndarray]
         self.mask: Optional[np.ndarray]
@@ -82,16 +84,7 @@ class TessellationBase(Evaluation):
         self.measure: float
         verbosity = verbosity
 
-        normalization_class = getattr(self, "Normalization", type("Normalization", (), {}))
-        self._normalizations = dict(vars(normalization_class))
-        if hasattr(self._normalizations, "__module__"):
-            del self._normalizations["__module__"]
-        if hasattr(self._normalizations, "__dict__"):
-            del self._normalizations["__dict__"]
-        if hasattr(self._normalizations, "__weakref__"):
-            del self._normalizations["__weakref__"]
-        if hasattr(self._normalizations, "__doc__"):
-            del self._normalizations["__doc__"]
+        self._normalizations = self._registered_normalizations()
 
         try:
             r = self._compute_delaunay(incremental, qhull_options)
@@ -161,23 +154,57 @@ class TessellationBase(Evaluation):
 
     def _compute_tracers(self) -> None:
         self.tracers = defaultdict(lambda: np.zeros(self.tri.nsimplex))
-        for i, simplex in enumerate(self.tri.simplices):
-            vertices = self.points[simplex]
 
-            # store extreme side lengths (for trimming)
-            side_lens = self.simplex_sides(*vertices)
-            self.tracers["largest side"][i] = max(side_lens)
-            self.tracers["smallest side"][i] = min(side_lens)
+        # vertices of every simplex, shape (nsimplex, ndim + 1, ndim)
+        vertices = self.points[self.tri.simplices]
 
-            # store simplex measures
-            self.tracers["measure"][i] = self.simplex_measure(*vertices)
+        # store extreme side lengths (for trimming)
+        side_lens = self.batch_simplex_sides(vertices)
+        self.tracers["largest side"] = np.max(side_lens, axis=1)
+        self.tracers["smallest side"] = np.min(side_lens, axis=1)
+
+        # store simplex measures
+        self.tracers["measure"] = self.batch_simplex_measures(vertices)
 
     def _compute_trimming(self, axis_ratio: float = 10) -> None:
+        self.mask = self._trimming_mask(axis_ratio)
+
+    def _trimming_mask(self, axis_ratio: Union[float, np.ndarray]) -> np.ndarray:
         # trim simplices with large sides
-        threshold = axis_ratio * np.median(self.tracers["smallest side"])
-        self.mask = self.tracers["largest side"] < threshold
+        # NOTE: array-valued axis ratios give one mask per ratio along the leading axes
+        threshold = np.multiply.outer(axis_ratio, np.median(self.tracers["smallest side"]))
+        return self.tracers["largest side"] < threshold[..., None]
+
+    def measures_for_axis_ratios(
+        self, axis_ratios: Union[Sequence[float], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Compute the measure for several trimming thresholds from this tessellation.
+
+        The triangulation, simplex tracers and normalization are reused,
+        so only the trimming step is repeated for each axis ratio.
+
+        Args:
+            axis_ratios (Sequence[float]): Thresholds for tessellation trimming.
+
+        Returns:
+            np.ndarray: The measure for each axis ratio.
+        """
+        ratios = np.asarray(axis_ratios, dtype=float)
+        if getattr(self, "mask", None) is None:
+            # degenerate tessellation, the measure is 0 for any threshold
+            return np.zeros(ratios.shape)
+        masks = self._trimming_mask(ratios)
+        return masks @ self.tracers["measure"] / self.normalization_const
 
     def _compute_normalization(self, routine: str) -> None:
+        self.normalization_const = self._normalization_const(routine)
+
+    def _normalization_const(self, routine: str) -> float:
+        method = self._normalization_method(routine)
+        return self._shared_value(("normalization", method), lambda: method(self))
+
+    def _normalization_method(self, routine: str) -> Callable:
         normalization_method: Callable = self._normalizations.get(routine, MISSING_METHOD)
         if normalization_method is MISSING_METHOD:
             message = f"Unrecognized normalization routine {routine}. "
@@ -187,7 +214,91 @@ class TessellationBase(Evaluation):
             else:
                 message += "No available normalizations for this class"
             raise ValueError(message)
-        self.normalization_const = normalization_method(self)
+        return normalization_method
+
+    def _shared_value(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get an intermediate value shared between normalization routines, computing it once.
+
+        Args:
+            key (Hashable): Name of the intermediate value.
+            compute (Callable[[], Any]): Function computing the value if it is not stored yet.
+
+        Returns:
+            Any: The stored intermediate value.
+        """
+        if key not in self._shared:
+            self._shared[key] = compute()
+        return self._shared[key]
+
+    @classmethod
+    def _registered_normalizations(cls) -> dict[str, Callable]:
+        normalization_class = getattr(cls, "Normalization", type("Normalization", (), {}))
+        return {
+            name: method
+            for name, method in vars(normalization_class).items()
+            if not name.startswith("_") and callable(method)
+        }
+
+    @classmethod
+    def normalization_routines(cls) -> list[str]:
+        """
+        Get the names of the registered normalization routines, without aliases (such as "default").
+
+        Returns:
+            List[str]: Names of the normalization routines.
+        """
+        routines: dict[Callable, str] = {}
+        for name, method in cls._registered_normalizations().items():
+            routines.setdefault(method, name)
+        return list(routines.values())
+
+    def _hull_vertices(self) -> np.ndarray:
+        # indices of the convex hull vertices, taken from the hull facets of the triangulation
+        return self._shared_value("hull vertices", lambda: np.unique(self.tri.convex_hull))
+
+    def normalization_consts(self, routines: Optional[Sequence[str]] = None) -> dict[str, float]:
+        """
+        Compute the normalization constants for several normalization routines.
+
+        Each distinct routine is computed once, and intermediate values
+        (such as radii or convex hull vertices) are shared between routines.
+
+        Args:
+            routines (Sequence[str], optional): Normalization routines to compute (default all routines).
+
+        Returns:
+            Dict[str, float]: The normalization constant for each routine.
+        """
+        if routines is None:
+            routines = self.normalization_routines()
+        return {routine: self._normalization_const(routine) for routine in routines}
+
+    def measures_for_normalizations(
+        self, routines: Optional[Sequence[str]] = None
+    ) -> dict[str, float]:
+        """
+        Compute the measure for several normalization routines from this tessellation.
+
+        The triangulation, simplex tracers and trimming are reused,
+        so only the normalization step is repeated for each routine.
+
+        Args:
+            routines (Sequence[str], optional): Normalization routines to compute (default all routines).
+
+        Returns:
+            Dict[str, float]: The measure for each normalization routine.
+        """
+        if routines is None:
+            routines = self.normalization_routines()
+        if getattr(self, "mask", None) is None:
+            # degenerate tessellation, the measure is 0 for any normalization
+            for routine in routines:
+                self._normalization_method(routine)
+            return {routine: 0.0 for routine in routines}
+        trimmed_measure = np.sum(self.tracers["measure"][self.mask])
+        consts = self.normalization_consts(routines)
+        return {routine: trimmed_measure / const for routine, const in consts.items()}
 
     @staticmethod
     @abstractmethod
@@ -219,6 +330,36 @@ class TessellationBase(Evaluation):
         """
         return 0.0
 
+    @classmethod
+    def batch_simplex_sides(cls, vertices: np.ndarray) -> np.ndarray:
+        """
+        Calculate the side lengths of a stack of simplices.
+        Subclasses should redefine this with a vectorized implementation;
+        by default it loops over `simplex_sides`.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, ndim + 1, ndim).
+
+        Returns:
+            np.ndarray: The side lengths of each simplex, shape (nsimplex, nsides).
+        """
+        return np.array([cls.simplex_sides(*simplex) for simplex in vertices], dtype=float)
+
+    @classmethod
+    def batch_simplex_measures(cls, vertices: np.ndarray) -> np.ndarray:
+        """
+        Calculate the measures of a stack of simplices.
+        Subclasses should redefine this with a vectorized implementation;
+        by default it loops over `simplex_measure`.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, ndim + 1, ndim).
+
+        Returns:
+            np.ndarray: The measure of each simplex, shape (nsimplex,).
+        """
+        return np.array([cls.simplex_measure(*simplex) for simplex in vertices], dtype=float)
+
     def plot(self, ax):
         """
         Plot the tessellation.
@@ -7,6 +7,8 @@ and triangle areas. The `Normalization` nested class includes normalization meth
 Additionally, the class offers a plotting function to visualize the tessellation.
 """
 
+from typing import Any, Callable
+
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy import linalg
@@ -53,6 +55,43 @@ class Tessellation2D(TessellationBase):
         (x1, y1), (x2, y2), (x3, y3) = vertices
         return abs((x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)) / 2
 
+    @staticmethod
+    def batch_simplex_sides(vertices: np.ndarray) -> np.ndarray:
+        """
+        Compute the side lengths of a stack of 2D simplices.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, 3, 2).
+
+        Returns:
+            np.ndarray: Side lengths of each simplex, shape (nsimplex, 3).
+
+        """
+        v1, v2, v3 = np.moveaxis(vertices, 1, 0)
+        return np.stack(
+            [
+                np.linalg.norm(v2 - v1, axis=-1),
+                np.linalg.norm(v3 - v1, axis=-1),
+                np.linalg.norm(v3 - v2, axis=-1),
+            ],
+            axis=-1,
+        )
+
+    @staticmethod
+    def batch_simplex_measures(vertices: np.ndarray) -> np.ndarray:
+        """
+        Compute the measures (areas) of a stack of 2D simplices.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, 3, 2).
+
+        Returns:
+            np.ndarray: The area of each simplex, shape (nsimplex,).
+
+        """
+        (x1, y1), (x2, y2), (x3, y3) = np.moveaxis(vertices, (1, 2), (0, 1))
+        return np.abs((x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)) / 2
+
     class Normalization:
         """
         A class providing various methods for normalization in 2D.
@@ -63,6 +102,7 @@ class Tessellation2D(TessellationBase):
         """
 
         points: np.ndarray
+        _shared_value: Callable[..., Any]
 
         def circle(self) -> float:
             """
@@ -71,7 +111,7 @@ class Tessellation2D(TessellationBase):
             Returns:
                 float: Area of the circle.
             """
-            r = linalg.norm(self.points, axis=1)
+            r = self._shared_value("radii", lambda: linalg.norm(self.points, axis=1))
             return np.pi * (max(r) ** 2)
 
         default = circle
@@ -7,6 +7,8 @@ and tetrahedron volumes. The `Normalization` nested class includes normalization
 Additionally, the class offers a plotting function to visualize the tessellation.
 """
 
+from typing import Any, Callable, Mapping
+
 import matplotlib.pyplot as plt
 import mpl_toolkits.mplot3d as a3
 import numpy as np
@@ -15,6 +17,12 @@ from scipy import linalg, spatial
 from .base import TessellationBase
 
 
+def _cylindrical_radii(tess) -> np.ndarray:
+    # shared between the cylinder and Rz_convexhull normalizations
+    x, y, z = tess.points.T
+    return tess._shared_value("cylindrical radii", lambda: np.sqrt(x**2 + y**2))
+
+
 class Tessellation3D(TessellationBase):
     """
     A class for the tessellation and trimming algorithm applied in 3 dimensions.
@@ -60,6 +68,47 @@ class Tessellation3D(TessellationBase):
         a3 = (x4 - x1) * ((y2 - y1) * (z3 - z1) - (y3 - y1) * (z2 - z1))
         return abs(a1 + a2 + a3) / 6
 
+    @staticmethod
+    def batch_simplex_sides(vertices: np.ndarray) -> np.ndarray:
+        """
+        Compute the side lengths of a stack of 3D simplices.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, 4, 3).
+
+        Returns:
+            np.ndarray: Side lengths of each simplex, shape (nsimplex, 6).
+
+        """
+        v1, v2, v3, v4 = np.moveaxis(vertices, 1, 0)
+        return np.stack(
+            [
+                np.linalg.norm(v2 - v1, axis=-1),
+                np.linalg.norm(v3 - v1, axis=-1),
+                np.linalg.norm(v4 - v1, axis=-1),
+                np.linalg.norm(v3 - v2, axis=-1),
+                np.linalg.norm(v4 - v2, axis=-1),
+                np.linalg.norm(v4 - v3, axis=-1),
+            ],
+            axis=-1,
+        )
+
+    @staticmethod
+    def batch_simplex_measures(vertices: np.ndarray) -> np.ndarray:
+        """
+        Compute the measures (volumes) of a stack of 3D simplices.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, 4, 3).
+
+        Returns:
+            np.ndarray: The volume of each simplex, shape (nsimplex,).
+
+        """
+        v1, v2, v3, v4 = np.moveaxis(vertices, 1, 0)
+        triple_product = np.einsum("ij,ij->i", v2 - v1, np.cross(v3 - v1, v4 - v1))
+        return np.abs(triple_product) / 6
+
     class Normalization:
         """
         A class providing various methods for normalization in 3D.
@@ -74,6 +123,9 @@ class Tessellation3D(TessellationBase):
         """
 
         points: np.ndarray
+        tracers: Mapping[str, np.ndarray]
+        _shared_value: Callable[..., Any]
+        _hull_vertices: Callable[[], np.ndarray]
 
         def sphere(self) -> float:
             """
@@ -82,7 +134,7 @@ class Tessellation3D(TessellationBase):
             Returns:
                 float: Volume of the sphere.
             """
-            r = linalg.norm(self.points, axis=1)
+            r = self._shared_value("radii", lambda: linalg.norm(self.points, axis=1))
             return 4 / 3 * np.pi * np.max(r) ** 3
 
         def cylinder(self) -> float:
@@ -93,7 +145,8 @@ class Tessellation3D(TessellationBase):
                 float: Volume of the cylinder.
             """
             x, y, z = self.points.T
-            return np.pi * np.max(x**2 + y**2) * (np.max(z) - np.min(z))
+            R = _cylindrical_radii(self)
+            return np.pi * np.max(R) ** 2 * (np.max(z) - np.min(z))
 
         def Rz_convexhull(self) -> float:
             """
@@ -103,7 +156,7 @@ class Tessellation3D(TessellationBase):
                 float: Volume of the convex hull after rotation.
             """
             x, y, z = self.points.T
-            R = np.sqrt(x**2 + y**2)
+            R = _cylindrical_radii(self)
             points = np.array([R, z]).T
             points = np.array([*points, [0, max(z)], [0, min(z)]])
             hull = spatial.ConvexHull(points)
@@ -130,9 +183,10 @@ class Tessellation3D(TessellationBase):
 
             Note:
                 This method may not work correctly for co-rotation cases.
+                The Delaunay tessellation fills the convex hull, so its volume is the
+                sum of all (untrimmed) simplex volumes.
             """
-            hull = spatial.ConvexHull(self.points)
-            return hull.volume
+            return float(np.sum(self.tracers["measure"]))
 
         def convexhull_rot4(self) -> float:
             """
@@ -140,8 +194,12 @@ class Tessellation3D(TessellationBase):
 
             Returns:
                 float: Volume of the convex hull.
+
+            Note:
+                Only vertices of the original convex hull can be vertices of the rotated
+                copies' convex hull, so only those are rotated.
             """
-            x, y, z = self.points.T
+            x, y, z = self.points[self._hull_vertices()].T
             r000 = np.array([+x, +y, z]).T
             r090 = np.array([-y, +x, z]).T
             r180 = np.array([-x, -y, z]).T
@@ -8,6 +8,7 @@ and simplex volumes. The `Normalization` nested class includes normalization met
 
 from __future__ import annotations
 
+from functools import lru_cache
 from itertools import combinations
 from math import factorial
 
@@ -17,6 +18,54 @@ from scipy import linalg, spatial
 from .base import TessellationBase
 
 
+@lru_cache(maxsize=None)
+def edge_indices(nvertices: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the vertex index pairs for every edge of a simplex.
+    Results are cached per number of vertices.
+
+    Args:
+        nvertices (int): The number of vertices of the simplex.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: First and second vertex indices of each edge.
+    """
+    pairs = np.array(list(combinations(range(nvertices), 2)), dtype=int).reshape(-1, 2)
+    first, second = pairs.T
+    first.setflags(write=False)
+    second.setflags(write=False)
+    return first, second
+
+
+def pairwise_side_lengths(vertices: np.ndarray) -> np.ndarray:
+    """
+    Compute the side lengths of a stack of simplices in a single call.
+
+    Args:
+        vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, ndim + 1, ndim).
+
+    Returns:
+        np.ndarray: Side lengths of each simplex, shape (nsimplex, (ndim + 1) * ndim / 2).
+    """
+    first, second = edge_indices(vertices.shape[-2])
+    return np.linalg.norm(vertices[..., second, :] - vertices[..., first, :], axis=-1)
+
+
+def stacked_volumes(vertices: np.ndarray) -> np.ndarray:
+    """
+    Compute the (unsigned) volumes of a stack of simplices with a stacked determinant.
+
+    Args:
+        vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, ndim + 1, ndim).
+
+    Returns:
+        np.ndarray: The volume of each simplex, shape (nsimplex,).
+    """
+    dim = vertices.shape[-1]
+    mats = vertices[..., 1:, :] - vertices[..., :1, :]
+    return np.abs(np.linalg.det(mats)) / factorial(dim)
+
+
 class TessellationGeneric(TessellationBase):
     """
     A class for the tessellation and trimming algorithm applied in N dimensions.
@@ -55,7 +104,33 @@ class TessellationGeneric(TessellationBase):
         first, *rest = vertices
         dim = len(first)
         mat = [v - first for v in rest]
-        return linalg.det(mat) / factorial(dim)
+        return abs(linalg.det(mat)) / factorial(dim)
+
+    @staticmethod
+    def batch_simplex_sides(vertices: np.ndarray) -> np.ndarray:
+        """
+        Compute the side lengths of a stack of N-D simplices.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, ndim + 1, ndim).
+
+        Returns:
+            np.ndarray: Side lengths of each simplex, shape (nsimplex, nsides).
+        """
+        return pairwise_side_lengths(vertices)
+
+    @staticmethod
+    def batch_simplex_measures(vertices: np.ndarray) -> np.ndarray:
+        """
+        Compute the measures (volumes) of a stack of N-D simplices.
+
+        Args:
+            vertices (np.ndarray): The vertices of the simplices, shape (nsimplex, ndim + 1, ndim).
+
+        Returns:
+            np.ndarray: The volume of each simplex, shape (nsimplex,).
+        """
+        return stacked_volumes(vertices)
 
     class Normalization(TessellationBase):
         """
@@ -91,9 +166,10 @@ class TessellationGeneric(TessellationBase):
 
             Note:
                 This method may not work correctly for co-rotation cases.
+                The Delaunay tessellation fills the convex hull, so its volume is the
+                sum of all (untrimmed) simplex volumes.
             """
-            points = self.tri.convex_hull
-            return spatial.ConvexHull(points).volume
+            return float(np.sum(self.tracers["measure"]))
 
         def convexhull_rot4(self) -> float:
             """
@@ -104,8 +180,10 @@ class TessellationGeneric(TessellationBase):
 
             Note:
                 This method involves rotations of the points using the first two axes.
+                Only vertices of the original convex hull can be vertices of the rotated
+                copies' convex hull, so only those are rotated.
             """
-            x, y, *rest = self.points.T
+            x, y, *rest = self.points[self._hull_vertices()].T
             r000 = np.array([+x, +y, *rest]).T
             r090 = np.array([-y, +x, *rest]).T
             r180 = np.array([-x, -y, *rest]).T
@@ -2,10 +2,12 @@
 This module defines utility functions for the analysis classes.
 """
 
-from typing import Any
+import types
+from typing import Any, Callable
 
 import astropy.coordinates as c
 import astropy.units as u
+import numpy as np
 
 
 def make_quantity(obj: Any, unit: u.Unit) -> u.Quantity:
@@ -36,4 +38,123 @@ def collapse_coords(coords: Any) -> c.SkyCoord:
     """
     if isinstance(coords, c.SkyCoord):
         return coords
+    if len(coords) == 1:
+        # c.concatenate cannot handle a single coordinate
+        return coords[0].reshape((-1,))
     return c.concatenate(coords)
+
+
+def broadcast_coords(coords: c.SkyCoord, size: int) -> c.SkyCoord:
+    """
+    Broadcast coordinates to a one-dimensional SkyCoord object of given size.
+
+    Args:
+        coords (c.SkyCoord): Coordinates of shape () or broadcastable to (size,).
+        size (int): Number of coordinates.
+
+    Returns:
+        SkyCoord object of shape (size,).
+    """
+    if not isinstance(coords, c.SkyCoord):
+        raise TypeError(f"Expected SkyCoord, got {type(coords).__name__}")
+    if coords.shape == (size,):
+        return coords
+    return np.broadcast_to(coords, (size,), subok=True)
+
+
+def broadcast_components(function: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Copy a function so that the SkyCoord objects it builds have broadcast components.
+
+    Astropy requires the velocities of coordinates to have the exact shape of their positions,
+    so that e.g. constant velocities cannot be combined with array-valued positions. The copy
+    looks SkyCoord up, directly or through the astropy.coordinates module, as a function
+    broadcasting its Quantity arguments to a common shape first. Functions not referring to
+    either are returned unchanged.
+
+    Args:
+        function (Callable[..., Any]): Function building coordinates.
+
+    Returns:
+        Callable[..., Any]: Copy of the function with its own globals.
+    """
+    if not isinstance(function, types.FunctionType):
+        return function
+    names = _global_names(function.__code__)
+    replacements = {
+        name: _broadcast_skycoord if value is c.SkyCoord else _broadcast_coordinates
+        for name, value in function.__globals__.items()
+        if name in names and (value is c.SkyCoord or value is c)
+    }
+    if not replacements:
+        return function
+    namespace = {**function.__globals__, **replacements}
+    copy = types.FunctionType(
+        function.__code__,
+        namespace,
+        function.__name__,
+        function.__defaults__,
+        function.__closure__,
+    )
+    copy.__kwdefaults__ = function.__kwdefaults__
+    return copy
+
+
+def _global_names(code: types.CodeType) -> set[str]:
+    # names looked up by a code object and the functions nested in it
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _broadcast_skycoord(*args: Any, **kwargs: Any) -> c.SkyCoord:
+    # frame attributes, such as galcen_distance, keep their own shape
+    positional = [i for i, value in enumerate(args) if isinstance(value, u.Quantity)]
+    named = [
+        name
+        for name, value in kwargs.items()
+        if isinstance(value, u.Quantity) and name not in c.frame_transform_graph.frame_attributes
+    ]
+    values = [args[i] for i in positional] + [kwargs[name] for name in named]
+    if len({np.shape(value) for value in values}) > 1:
+        broadcast = np.broadcast_arrays(*values, subok=True)
+        args = tuple(
+            broadcast[positional.index(i)] if i in positional else value
+            for i, value in enumerate(args)
+        )
+        kwargs.update(zip(named, broadcast[len(positional) :]))
+    return c.SkyCoord(*args, **kwargs)
+
+
+class _BroadcastCoordinates(types.ModuleType):
+    # astropy.coordinates, with SkyCoord broadcasting its components
+    SkyCoord = staticmethod(_broadcast_skycoord)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(c, name)
+
+
+_broadcast_coordinates = _BroadcastCoordinates(c.__name__)
+
+
+def coords_close(first: c.SkyCoord, second: c.SkyCoord) -> bool:
+    """
+    Check whether two coordinates have the same frame, positions and velocities.
+
+    Args:
+        first (c.SkyCoord): First coordinates.
+        second (c.SkyCoord): Second coordinates.
+
+    Returns:
+        True if the coordinates match within floating point tolerance.
+    """
+    if first.frame.name != second.frame.name:
+        return False
+    if not u.allclose(first.cartesian.xyz, second.cartesian.xyz):
+        return False
+    first_velocity = "s" in first.data.differentials
+    if first_velocity != ("s" in second.data.differentials):
+        return False
+    return not first_velocity or u.allclose(first.velocity.d_xyz, second.velocity.d_xyz)
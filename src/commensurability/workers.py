@@ -0,0 +1,280 @@
+"""
+This module defines the functions run by worker processes in the
+multiprocessing analysis path, and the shared memory blocks used to
+transport integrated orbits to them without pickling. It also defines
+the self-contained tasks submitted to executors.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.pool import Pool
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import astropy.coordinates as c
+import astropy.units as u
+import numpy as np
+
+# per-process state, set by the pool initializer in worker processes
+_evaluator: Optional[Callable[[Any], Any]] = None
+_analysis: Optional[Any] = None
+
+# shared memory blocks attached by this process, by name
+_attached: dict[str, shared_memory.SharedMemory] = {}
+
+
+class SharedOrbits:
+    """
+    Integrated orbit positions stored in a shared memory block of shape (n_orbits, steps, ndim).
+
+    The process creating the block owns it and must unlink it (by using the block as a
+    context manager). Pickled copies only carry the block name, shape and unit, and
+    attach to the same memory when unpickled in another process.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        shape (Tuple[int, int, int]): Shape of the block, (n_orbits, steps, ndim).
+        unit (u.Unit): Unit of the stored positions.
+    """
+
+    def __init__(self, name: str, shape: tuple[int, int, int], unit: Any) -> None:
+        self.name = name
+        self.shape = shape
+        self.unit = u.Unit(unit)
+        self._owner: Optional[shared_memory.SharedMemory] = None
+
+    def __reduce__(self):
+        return self.__class__, (self.name, self.shape, self.unit.to_string())
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __enter__(self) -> SharedOrbits:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.unlink()
+
+    @classmethod
+    def from_orbits(cls, orbits: c.CartesianRepresentation) -> SharedOrbits:
+        """
+        Copy integrated orbits into a new shared memory block.
+
+        Args:
+            orbits (c.CartesianRepresentation): Orbit positions of shape (n_orbits, steps).
+
+        Returns:
+            SharedOrbits: The shared memory block owned by this process.
+        """
+        xyz = orbits.xyz
+        positions = np.moveaxis(xyz.value, 0, -1).reshape(-1, xyz.shape[-1], xyz.shape[0])
+        shm = shared_memory.SharedMemory(create=True, size=max(positions.nbytes, 1))
+        block = cls(shm.name, positions.shape, xyz.unit)
+        block._owner = shm
+        block.positions()[...] = positions
+        return block
+
+    def positions(self) -> np.ndarray:
+        """
+        Get a zero-copy view of the stored positions.
+
+        Returns:
+            np.ndarray: Array of shape (n_orbits, steps, ndim) backed by the shared memory.
+        """
+        shm = self._owner or _attach(self.name)
+        return np.ndarray(self.shape, dtype=float, buffer=shm.buf)
+
+    def orbit(self, index: int) -> c.CartesianRepresentation:
+        """
+        Get a single orbit as a zero-copy Cartesian representation.
+
+        Args:
+            index (int): Index of the orbit in the block.
+
+        Returns:
+            c.CartesianRepresentation: Orbit positions of shape (steps,).
+        """
+        return c.CartesianRepresentation(self.positions()[index].T, unit=self.unit, copy=False)
+
+    def unlink(self) -> None:
+        """
+        Release the shared memory block; only the owning process can do this.
+        """
+        if self._owner is not None:
+            self._owner.close()
+            self._owner.unlink()
+            self._owner = None
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if name not in _attached:
+        # detach from blocks of earlier chunks, which are unlinked by their owner once evaluated
+        for other in list(_attached):
+            try:
+                _attached[other].close()
+            except BufferError:
+                # still referenced by a live view, retry later
+                continue
+            del _attached[other]
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return _attached[name]
+
+
+def make_pool(
+    processes: Optional[int], evaluator: Callable[[Any], Any], analysis: Optional[Any] = None
+) -> Pool:
+    """
+    Create a pool of worker processes evaluating orbits.
+
+    Args:
+        processes (Optional[int]): Number of worker processes (default os.cpu_count()).
+        evaluator (Callable[[Any], Any]): Function mapping an orbit to its measure.
+        analysis (Optional[AnalysisBase]): Analysis for workers to integrate orbits (default None).
+
+    Returns:
+        Pool: The pool of initialized worker processes.
+    """
+    # workers must share the resource tracker of this process; otherwise each worker
+    # tracks the shared memory blocks it attaches to and warns about them at exit
+    resource_tracker.ensure_running()
+    return Pool(processes, initializer=init_worker, initargs=(evaluator, analysis))
+
+
+@contextmanager
+def worker_pool(
+    processes: Optional[int], evaluator: Callable[[Any], Any], analysis: Optional[Any] = None
+) -> Iterator[Pool]:
+    """
+    Context manager for a pool of worker processes evaluating orbits.
+
+    The pool is closed and joined on exit, or terminated if an error
+    (including KeyboardInterrupt) is raised.
+
+    Args:
+        processes (Optional[int]): Number of worker processes (default os.cpu_count()).
+        evaluator (Callable[[Any], Any]): Function mapping an orbit to its measure.
+        analysis (Optional[AnalysisBase]): Analysis for workers to integrate orbits (default None).
+
+    Yields:
+        Pool: The pool of initialized worker processes.
+    """
+    pool = make_pool(processes, evaluator, analysis)
+    try:
+        yield pool
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+def init_worker(evaluator: Callable[[Any], Any], analysis: Optional[Any] = None) -> None:
+    """
+    Initialize a worker process with the function evaluating orbits.
+
+    If an analysis is given, the worker builds its own potential from the
+    analysis' potential function, to integrate orbits with `integrate_and_evaluate`.
+
+    Args:
+        evaluator (Callable[[Any], Any]): Function mapping an orbit to its measure.
+        analysis (Optional[AnalysisBase]): Analysis to integrate orbits with (default None).
+    """
+    global _evaluator, _analysis
+    _evaluator = evaluator
+    _analysis = analysis
+    if analysis is not None:
+        analysis.potential = analysis.potential_function()
+
+
+def evaluate_orbit(orbit: Any) -> Any:
+    """
+    Evaluate an orbit in a worker process.
+
+    Args:
+        orbit (Any): Integrated orbit.
+
+    Returns:
+        Any: Measure of the orbit.
+    """
+    if _evaluator is None:
+        raise RuntimeError("Worker process was not initialized with an evaluator")
+    return _evaluator(orbit)
+
+
+def evaluate_indexed_orbit(task: tuple[int, Any]) -> tuple[int, Any]:
+    """
+    Evaluate an orbit in a worker process, keeping track of its index within a chunk.
+
+    Args:
+        task (Tuple[int, Any]): Index and integrated orbit.
+
+    Returns:
+        Tuple[int, Any]: Index and measure of the orbit.
+    """
+    index, orbit = task
+    return index, evaluate_orbit(orbit)
+
+
+def evaluate_shared_orbit(task: tuple[SharedOrbits, int]) -> tuple[int, Any]:
+    """
+    Evaluate an orbit stored in a shared memory block in a worker process.
+
+    Args:
+        task (Tuple[SharedOrbits, int]): Shared memory block and index of the orbit.
+
+    Returns:
+        Tuple[int, Any]: Index and measure of the orbit.
+    """
+    block, index = task
+    return index, evaluate_orbit(block.orbit(index))
+
+
+def integrate_and_evaluate(
+    pixels: list[tuple[int, ...]],
+) -> tuple[list[tuple[int, ...]], list[Any]]:
+    """
+    Integrate and evaluate the orbits of a chunk of pixels in a worker process.
+
+    Args:
+        pixels (List[Tuple[int]]): Indices of the grid points to integrate.
+
+    Returns:
+        Tuple[List[Tuple[int]], List[Any]]: The pixels and the measure of each orbit.
+    """
+    if _analysis is None:
+        raise RuntimeError("Worker process was not initialized with an analysis")
+    return pixels, integrate_and_evaluate_with(_analysis, evaluate_orbit, pixels)
+
+
+def evaluate_orbits(evaluator: Callable[[Any], Any], orbits: Iterable[Any]) -> list[Any]:
+    """
+    Evaluate a batch of orbits, as a task submitted to an executor.
+
+    Args:
+        evaluator (Callable[[Any], Any]): Function mapping an orbit to its measure.
+        orbits (Iterable[Any]): Integrated orbits.
+
+    Returns:
+        List[Any]: Measure of each orbit.
+    """
+    return [evaluator(orbit) for orbit in orbits]
+
+
+def integrate_and_evaluate_with(
+    analysis: Any, evaluator: Callable[[Any], Any], pixels: list[tuple[int, ...]]
+) -> list[Any]:
+    """
+    Integrate and evaluate the orbits of a chunk of pixels, as a task submitted to an executor.
+
+    Args:
+        analysis (AnalysisBase): Analysis to integrate orbits with.
+        evaluator (Callable[[Any], Any]): Function mapping an orbit to its measure.
+        pixels (List[Tuple[int]]): Indices of the grid points to integrate.
+
+    Returns:
+        List[Any]: Measure of each orbit.
+    """
+    return evaluate_orbits(evaluator, analysis._integrate_chunk(pixels))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from astropy import coordinates as c
+from astropy import units as u
+from pidgey.base import Backend
+
+
+class DummyBackend(Backend):
+    def ORBIT_TYPE(self):
+        return list
+
+    def _compute_orbit(self, skycoord, pot, dt, steps, pattern_speed):
+        # the same tetrahedron for every initial condition
+        n = skycoord.size
+        return c.SkyCoord(
+            x=[[0] * n, [0] * n, [0] * n, [1] * n],
+            y=[[0] * n, [0] * n, [1] * n, [0] * n],
+            z=[[0] * n, [1] * n, [0] * n, [0] * n],
+            unit="kpc",
+            representation_type="cartesian",
+        )
+
+    def _extract_points(self, orbit, pattern_speed):
+        return orbit.data.T
+
+
+class VaryingBackend(DummyBackend):
+    def _compute_orbit(self, skycoord, pot, dt, steps, pattern_speed):
+        # a distinct cloud of points for each initial condition, so that measures differ
+        positions = skycoord.cartesian.xyz.to_value(u.kpc).reshape(3, -1).T
+        points = np.array(
+            [
+                np.random.default_rng(np.round(np.abs(xyz) * 1000).astype(int).tolist()).normal(
+                    size=(12, 3)
+                )
+                for xyz in positions
+            ]
+        )
+        x, y, z = np.transpose(points)
+        return c.SkyCoord(x=x, y=y, z=z, unit="kpc", representation_type="cartesian")
+
+
+@pytest.fixture
+def dummy_backend():
+    return DummyBackend()
+
+
+@pytest.fixture
+def varying_backend():
+    return VaryingBackend()
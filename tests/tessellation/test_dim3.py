@@ -2,6 +2,7 @@ import math
 
 import numpy as np
 import pytest
+from scipy import spatial
 
 from commensurability.tessellation import Tessellation
 
@@ -42,3 +43,49 @@ class TestNormalizations:
                 qhull_options="Qz",
                 incremental=False,
             )
+
+    def test_all_normalizations(self):
+        points = np.random.default_rng(0).normal(size=(200, 3))
+        tess = Tessellation(points)
+        measures = tess.measures_for_normalizations()
+        assert list(measures) == [
+            "sphere",
+            "cylinder",
+            "Rz_convexhull",
+            "convexhull",
+            "convexhull_rot4",
+        ]
+        for norm, measure in measures.items():
+            expected = Tessellation(points, normalization_routine=norm).measure
+            assert math.isclose(measure, expected)
+        assert math.isclose(tess.measures_for_normalizations(["default"])["default"], tess.measure)
+
+    def test_unrecognized_normalization_in_sweep(self):
+        points = np.random.default_rng(0).normal(size=(50, 3))
+        with pytest.raises(ValueError, match="Unrecognized normalization routine"):
+            Tessellation(points).measures_for_normalizations(["unknown"])
+
+    def test_convexhull_rot4_matches_all_points(self):
+        points = np.random.default_rng(1).normal(size=(500, 3)) + [2, 0, 0]
+        tess = Tessellation(points, normalization_routine="convexhull_rot4")
+        x, y, z = points.T
+        rotated = np.concatenate(
+            [
+                np.array([+x, +y, z]).T,
+                np.array([-y, +x, z]).T,
+                np.array([-x, -y, z]).T,
+                np.array([+y, -x, z]).T,
+            ]
+        )
+        assert math.isclose(tess.normalization_const, spatial.ConvexHull(rotated).volume)
+
+    @pytest.mark.parametrize("qhull_options", [None, "Qz"])
+    def test_convexhull_from_triangulation(self, qhull_options):
+        points = np.random.default_rng(2).normal(size=(500, 3))
+        tess = Tessellation(
+            points,
+            normalization_routine="convexhull",
+            qhull_options=qhull_options,
+            incremental=False,
+        )
+        assert math.isclose(tess.normalization_const, spatial.ConvexHull(points).volume)
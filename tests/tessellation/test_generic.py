@@ -2,8 +2,14 @@ import math
 
 import numpy as np
 import pytest
+from scipy import spatial
 
 from commensurability.tessellation import Tessellation
+from commensurability.tessellation.generic import (
+    TessellationGeneric,
+    pairwise_side_lengths,
+    stacked_volumes,
+)
 
 
 class TestNormalizations:
@@ -43,3 +49,55 @@ class TestNormalizations:
                 qhull_options="Qz",
                 incremental=False,
             )
+
+
+class TestKernels:
+    @pytest.mark.parametrize("ndim", [4, 5, 6])
+    def test_volumes_sum_to_hull(self, ndim):
+        rng = np.random.default_rng(ndim)
+        points = rng.normal(size=(60, ndim))
+        tess = Tessellation(points, axis_ratio=np.inf, normalization_routine="nsphere_approx")
+        volumes = tess.tracers["measure"]
+        assert np.all(volumes >= 0)
+        assert math.isclose(np.sum(volumes), spatial.ConvexHull(points).volume)
+
+    @pytest.mark.parametrize("ndim", [4, 5, 6])
+    def test_side_lengths(self, ndim):
+        rng = np.random.default_rng(ndim)
+        vertices = rng.normal(size=(10, ndim + 1, ndim))
+        sides = pairwise_side_lengths(vertices)
+        assert sides.shape == (10, (ndim + 1) * ndim // 2)
+        for simplex_sides, simplex in zip(sides, vertices):
+            assert np.allclose(simplex_sides, TessellationGeneric.simplex_sides(*simplex))
+
+    def test_unsigned_volume(self):
+        vertices = np.eye(5, 4)
+        flipped = vertices[[1, 0, 2, 3, 4]]
+        volumes = stacked_volumes(np.array([vertices, flipped]))
+        assert np.allclose(volumes, 1 / 24)
+        assert math.isclose(TessellationGeneric.simplex_measure(*flipped), 1 / 24)
+
+    def test_convexhull_rot4_matches_all_points(self):
+        points = np.random.default_rng(1).normal(size=(200, 4)) + [2, 0, 0, 0]
+        tess = Tessellation(points, normalization_routine="convexhull_rot4")
+        x, y, *rest = points.T
+        rotated = np.concatenate(
+            [
+                np.array([+x, +y, *rest]).T,
+                np.array([-y, +x, *rest]).T,
+                np.array([-x, -y, *rest]).T,
+                np.array([+y, -x, *rest]).T,
+            ]
+        )
+        assert math.isclose(tess.normalization_const, spatial.ConvexHull(rotated).volume)
+
+    @pytest.mark.parametrize("qhull_options", [None, "Qz"])
+    def test_convexhull_from_triangulation(self, qhull_options):
+        points = np.random.default_rng(2).normal(size=(200, 4))
+        tess = Tessellation(
+            points,
+            normalization_routine="convexhull",
+            qhull_options=qhull_options,
+            incremental=False,
+        )
+        assert math.isclose(tess.normalization_const, spatial.ConvexHull(points).volume)
@@ -596,3 +596,29 @@ class TestMeasure:
     # def test_pseudorandom_point_sets_in_3D(self, points, expected_measure):
     #     tess = Tessellation(points)
     #     assert tess.measure == expected_measure
+
+
+class TestBatchedTracers:
+    @pytest.mark.parametrize("ndim", [2, 3, 4])
+    def test_batch_matches_scalar(self, ndim):
+        points = rng.normal(size=(200, ndim))
+        tess = Tessellation(points)
+        cls = tess.__class__
+        vertices = points[tess.tri.simplices]
+
+        sides = cls.batch_simplex_sides(vertices)
+        measures = cls.batch_simplex_measures(vertices)
+        for simplex_sides, measure, simplex in zip(sides, measures, vertices):
+            assert np.allclose(simplex_sides, cls.simplex_sides(*simplex))
+            assert math.isclose(measure, cls.simplex_measure(*simplex))
+
+    @pytest.mark.parametrize("ndim", [2, 3, 4])
+    def test_tracers_match_scalar(self, ndim):
+        points = rng.normal(size=(200, ndim))
+        tess = Tessellation(points)
+        cls = tess.__class__
+        for i, simplex in enumerate(points[tess.tri.simplices]):
+            side_lens = cls.simplex_sides(*simplex)
+            assert math.isclose(tess.tracers["largest side"][i], max(side_lens))
+            assert math.isclose(tess.tracers["smallest side"][i], min(side_lens))
+            assert math.isclose(tess.tracers["measure"][i], cls.simplex_measure(*simplex))
@@ -1,30 +1,46 @@
+import gc
+import itertools
+import math
+import threading
+import time
+import warnings
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import h5py
+import numpy as np
 import pytest
 from astropy import coordinates as c
 from astropy import units as u
-from pidgey.base import Backend
 
 from commensurability import TessellationAnalysis, TessellationAnalysis2D
+from commensurability.tessellation import Tessellation
 
 
-@pytest.fixture
-def dummy_backend():
-    class DummyBackend(Backend):
-        def ORBIT_TYPE(self):
-            return list
+def grid_ic_function(x, y):
+    # importable, so that tasks integrating orbits can be sent to worker processes
+    return c.SkyCoord(
+        x=x * u.kpc,
+        y=y * u.kpc,
+        z=0 * u.kpc,
+        v_x=0 * u.km / u.s,
+        v_y=0 * u.km / u.s,
+        v_z=0 * u.km / u.s,
+        representation_type="cartesian",
+    )
 
-        def _compute_orbit(self, skycoord, pot, dt, steps, pattern_speed):
-            return c.SkyCoord(
-                x=[[0], [0], [0], [1]],
-                y=[[0], [0], [1], [0]],
-                z=[[0], [1], [0], [0]],
-                unit="kpc",
-                representation_type="cartesian",
-            )
 
+def zero_potential():
+    return 0.0
+
+
+@pytest.fixture
+def dimensionless_backend(dummy_backend):
+    class DimensionlessBackend(dummy_backend.__class__):
+        # positions without units, as returned by agama
         def _extract_points(self, orbit, pattern_speed):
-            return orbit.data.T
+            return c.CartesianRepresentation(orbit.data.T.xyz.to_value(u.kpc))
 
-    return DummyBackend()
+    return DimensionlessBackend()
 
 
 @pytest.fixture
@@ -49,6 +65,76 @@ def dummy_potential_func():
     return dummy_potential
 
 
+class FailingAnalysis(TessellationAnalysis):
+    @staticmethod
+    def __eval__(orbit):
+        raise RuntimeError("evaluation failed")
+
+
+class StepAnalysis(TessellationAnalysis):
+    # measures jump across x = 20, without integrating orbits
+    def _compute_selection(self, selection, progressbar):
+        pixels = [tuple(pixel) for pixel in np.argwhere(self._pending(selection))]
+        self._store_chunk(pixels, [float(pixel[0] >= 20) for pixel in pixels])
+
+
+class CountingAnalysis(TessellationAnalysis):
+    def _integrate_chunk(self, pixels):
+        self.__dict__.setdefault("integrated", []).extend(pixels)
+        return super()._integrate_chunk(pixels)
+
+
+class BlockingAnalysis(TessellationAnalysis):
+    # the first evaluation waits until another chunk is collected
+    calls = itertools.count()
+    released = threading.Event()
+    waited: list[bool] = []
+
+    @staticmethod
+    def __eval__(orbit):
+        if next(BlockingAnalysis.calls) == 0:
+            BlockingAnalysis.waited.append(BlockingAnalysis.released.wait(5))
+        return TessellationAnalysis.__eval__(orbit)
+
+
+class ShuffledAnalysis(TessellationAnalysis):
+    # evaluations take varying times, so that workers complete them out of order
+    @staticmethod
+    def __eval__(orbit):
+        time.sleep(0.01 * abs(float(orbit.x[0].value)))
+        return TessellationAnalysis.__eval__(orbit)
+
+
+class SerialExecutor(Executor):
+    # runs every task on submission, for deterministic tests
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def serial_measures(ic_function, ic_values, potential_function, backend, **kwargs):
+    # one orbit per chunk, integrated and evaluated in this process
+    measures = TessellationAnalysis(
+        ic_function,
+        ic_values,
+        potential_function,
+        1,
+        1,
+        backend=backend,
+        pidgey_chunksize=1,
+        executor=SerialExecutor(),
+        **kwargs,
+    ).measures
+    # otherwise measures in the wrong grid points could go unnoticed
+    pixels = measures.reshape(math.prod(len(values) for values in ic_values.values()), -1)
+    assert len(np.unique(pixels, axis=0)) == len(pixels)
+    return measures
+
+
 class TestAnalysis:
     @pytest.fixture
     def analysis(self, ic_params, dummy_potential_func, dummy_backend):
@@ -126,6 +212,87 @@ class TestAnalysis:
                 mp_chunksize=-1,
             )
 
+    @pytest.mark.parametrize("processes", [0, -1])
+    def test_invalid_processes(self, ic_params, dummy_potential_func, dummy_backend, processes):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                processes=processes,
+            )
+
+    @pytest.mark.parametrize("mp_chunksize", [1, 2])
+    @pytest.mark.parametrize("pipeline_depth", [0, 1, 3])
+    def test_pipelined(
+        self, ic_params, dummy_potential_func, varying_backend, pipeline_depth, mp_chunksize
+    ):
+        # orbits are shared with a single pool of workers across chunks
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=varying_backend,
+            pidgey_chunksize=3,
+            mp_chunksize=mp_chunksize,
+            pipeline_depth=pipeline_depth,
+            processes=2,
+        )
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        assert np.array_equal(analysis.measures, serial)
+
+    @pytest.mark.parametrize("pidgey_chunksize", [2, 3, 9])
+    def test_integrate_in_workers(
+        self, ic_params, dummy_potential_func, varying_backend, pidgey_chunksize
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=varying_backend,
+            pidgey_chunksize=pidgey_chunksize,
+            integrate_in_workers=True,
+            processes=2,
+        )
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        assert np.array_equal(analysis.measures, serial)
+
+    def test_negative_pipeline_depth(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                pipeline_depth=-1,
+            )
+
+    def test_failing_evaluation(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with pytest.raises(RuntimeError, match="evaluation failed"):
+            FailingAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                processes=2,
+            )
+
     def test_large_mp_chunksize(self, ic_params, dummy_potential_func, dummy_backend):
         ic_function, ic_values = ic_params
         with pytest.raises(ValueError):
@@ -168,12 +335,1386 @@ class TestAnalysis:
         assert analysis.steps == 1
         assert analysis.backend == dummy_backend
 
+    def test_read_defers_potential(
+        self, ic_params, dummy_potential_func, dummy_backend, capsys, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend, lazy=True
+        )
+        analysis.save(tmp_path / "test_read_defers_potential.hdf5")
+
+        class UnavailableBackend(dummy_backend.__class__):
+            def __init__(self):
+                raise ImportError("backend not installed")
+
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_read_defers_potential.hdf5", backend_cls=UnavailableBackend
+        )
+        assert capsys.readouterr().out == ""
+        assert not loaded._potential_built
+        assert np.all(loaded.measures == analysis.measures)
+        with pytest.raises(ImportError):
+            loaded.compute((0, 0))
+
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_read_defers_potential.hdf5", backend_cls=dummy_backend.__class__
+        )
+        loaded.compute((0, 0))
+        assert loaded.potential == 0.0
+        assert isinstance(loaded.backend, dummy_backend.__class__)
+
+    def test_none_potential_built_once(self, ic_params, dummy_backend):
+        ic_function, ic_values = ic_params
+        calls = []
+
+        def potential_function():
+            calls.append(None)
+
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, potential_function, 1, 1, backend=dummy_backend
+        )
+        assert analysis.potential is None and analysis.potential is None
+        assert len(calls) == 1
+
     def test_analysis_measures(self, analysis):
         for pixel in analysis:
             ic, measure = analysis[pixel]
             # specifically for these dummy examples
             assert measure == 0.0
 
+    def test_vectorized_initial_conditions(self, dummy_potential_func, dummy_backend):
+        ic_function = lambda x, vy: c.SkyCoord(
+            x=x * u.kpc,
+            y=0 * u.kpc,
+            z=0 * u.kpc,
+            v_x=0 * u.km / u.s,
+            v_y=vy * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        ic_values = {"x": [0, 1, 2], "vy": [0, 10, 20]}
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        assert analysis.vectorized_ic is True
+        pixels = list(analysis)
+        coords = analysis._initial_conditions(pixels)
+        assert coords.shape == (9,)
+        for pixel, coord in zip(pixels, coords):
+            ic, _ = analysis[pixel]
+            assert coord.x == ic.x and coord.v_y == ic.v_y
+
+    def test_constant_velocity_broadcast(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UserWarning)
+            analysis = TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                pidgey_chunksize=2,
+            )
+        assert analysis.vectorized_ic is True
+        coords = analysis._initial_conditions([(0, 0), (2, 1)])
+        assert all(coords.x == [0, 2] * u.kpc)
+        assert all(coords.y == [0, 1] * u.kpc)
+        assert all(coords.v_x == [0, 0] * u.km / u.s)
+
+    def test_scalar_ic_fallback(self, dummy_potential_func, dummy_backend):
+        ic_function = lambda x, y: c.SkyCoord(
+            x=math.hypot(x, y) * u.kpc,
+            y=0 * u.kpc,
+            z=0 * u.kpc,
+            v_x=0 * u.km / u.s,
+            v_y=0 * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        ic_values = {"x": [0, 3], "y": [0, 4]}
+        with pytest.warns(UserWarning, match="once per pixel"):
+            analysis = TessellationAnalysis(
+                ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+            )
+        assert analysis.vectorized_ic is False
+        coords = analysis._initial_conditions([(0, 0), (1, 1)])
+        assert all(coords.x == [0, 5] * u.kpc)
+
+    def test_inconsistent_ic_fallback(self, dummy_potential_func, dummy_backend):
+        # only consistent with scalar calls on the first pixel
+        ic_function = lambda x, y: c.SkyCoord(
+            x=x * u.kpc,
+            y=np.min(y) * u.kpc,
+            z=0 * u.kpc,
+            v_x=0 * u.km / u.s,
+            v_y=0 * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        ic_values = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        with pytest.warns(UserWarning, match="once per pixel"):
+            analysis = TessellationAnalysis(
+                ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+            )
+        assert analysis.vectorized_ic is False
+
+    def test_single_pixel_chunk_undecided(self, dummy_potential_func, dummy_backend):
+        # any ic_function passes the check on a single grid point
+        ic_function = lambda x, y: c.SkyCoord(
+            x=x * u.kpc,
+            y=y * u.kpc,
+            z=0 * u.kpc,
+            v_x=(1.0 if x > 1 else 0.0) * u.km / u.s,
+            v_y=0 * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        ic_values = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        baseline = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            vectorized_ic=False,
+        )
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend, lazy=True
+        )
+        assert analysis[(0, 0)][1] == baseline.measures[0, 0]
+        assert analysis.vectorized_ic is None
+        with pytest.warns(UserWarning, match="once per pixel"):
+            analysis.compute()
+        assert analysis.vectorized_ic is False
+        np.testing.assert_array_equal(analysis.measures, baseline.measures)
+
+    def test_single_pixel_autotune(self, dummy_potential_func, dummy_backend):
+        ic_function = lambda x, y: c.SkyCoord(
+            x=x * u.kpc,
+            y=y * u.kpc,
+            z=0 * u.kpc,
+            v_x=(1.0 if x > 1 else 0.0) * u.km / u.s,
+            v_y=0 * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        ic_values = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        with pytest.warns(UserWarning, match="once per pixel"):
+            analysis = TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                pidgey_chunksize=1,
+                autotune=True,
+            )
+        assert analysis.vectorized_ic is False
+        assert np.all(np.isfinite(analysis.measures))
+
+    def test_detected_vectorized_ic_fallback(self, dummy_potential_func, dummy_backend):
+        ic_function = lambda x, y: c.SkyCoord(
+            x=x * u.kpc,
+            y=y * u.kpc,
+            z=0 * u.kpc,
+            # only supports chunks of a single y value
+            v_x=np.unique(y).item() * u.km / u.s,
+            v_y=0 * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        analysis = TessellationAnalysis(
+            ic_function,
+            {"x": [0, 1, 2], "y": [0, 1, 2]},
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            lazy=True,
+        )
+        analysis._initial_conditions([(0, 0), (1, 0)])
+        assert analysis.vectorized_ic is True
+        with pytest.warns(UserWarning, match="once per pixel"):
+            coords = analysis._initial_conditions([(0, 1), (1, 2)])
+        assert analysis.vectorized_ic is False
+        assert all(coords.v_x == [1, 2] * u.km / u.s)
+
+    def test_forced_vectorized_ic(self, dummy_potential_func, dummy_backend):
+        ic_function = lambda x, y: c.SkyCoord(
+            x=math.hypot(x, y) * u.kpc,
+            y=0 * u.kpc,
+            z=0 * u.kpc,
+            representation_type="cartesian",
+        )
+        with pytest.raises(TypeError):
+            TessellationAnalysis(
+                ic_function,
+                {"x": [0, 3], "y": [0, 4]},
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                vectorized_ic=True,
+            )
+
+    def test_checkpoint(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=3,
+            checkpoint=tmp_path / "test_checkpoint.hdf5",
+        )
+        assert analysis.done.all()
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_checkpoint.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert np.all(loaded.measures == analysis.measures)
+        assert loaded.done.all()
+
+    def test_checkpoint_plane_writes(
+        self, dummy_potential_func, dummy_backend, monkeypatch, tmp_path
+    ):
+        ic_function = lambda x, y, z: c.SkyCoord(
+            x=x * u.kpc,
+            y=y * u.kpc,
+            z=z * u.kpc,
+            v_x=0 * u.km / u.s,
+            v_y=0 * u.km / u.s,
+            v_z=0 * u.km / u.s,
+            representation_type="cartesian",
+        )
+        ic_values = {"x": [0, 1], "y": [0, 1, 2], "z": [0, 1, 2, 3]}
+        writes = []
+        original = h5py.Dataset.__setitem__
+
+        def record(dset, index, value):
+            if dset.name == "/TessellationAnalysis":
+                writes.append(index)
+            original(dset, index, value)
+
+        monkeypatch.setattr(h5py.Dataset, "__setitem__", record)
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=5,
+            checkpoint=tmp_path / "checkpoint.hdf5",
+        )
+        assert analysis.done.all()
+        # every write stays within a single plane chunk
+        assert writes and all(isinstance(index[2], int) for index in writes)
+        with h5py.File(tmp_path / "checkpoint.hdf5", "r") as f:
+            assert np.array_equal(f["TessellationAnalysis"][()], analysis.measures)
+            assert f["TessellationAnalysis_done"][()].all()
+
+    @pytest.mark.parametrize("integrate_in_workers", [False, True])
+    def test_resume(
+        self, ic_params, dummy_potential_func, dummy_backend, integrate_in_workers, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        path = tmp_path / "test_resume.hdf5"
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=3,
+            checkpoint=path,
+        )
+        # pretend the run stopped after the first row, with a marker to detect recomputation
+        with h5py.File(path, "r+") as f:
+            f["TessellationAnalysis"][0] = -1.0
+            f["TessellationAnalysis"][1:] = 0.0
+            f["TessellationAnalysis_done"][1:] = False
+
+        partial = TessellationAnalysis.read_from_hdf5(path, backend_cls=dummy_backend.__class__)
+        assert np.all(partial.done == [[True] * 3, [False] * 3, [False] * 3])
+
+        resumed = TessellationAnalysis.resume(
+            path,
+            backend_cls=dummy_backend.__class__,
+            pidgey_chunksize=3,
+            integrate_in_workers=integrate_in_workers,
+        )
+        assert resumed.done.all()
+        assert np.all(resumed.measures[0] == -1.0)
+        assert np.all(resumed.measures[1:] == analysis.measures[1:])
+        with h5py.File(path, "r") as f:
+            assert f["TessellationAnalysis_done"][()].all()
+            assert np.all(f["TessellationAnalysis"][1:] == analysis.measures[1:])
+
+    def test_mismatched_checkpoint(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        path = tmp_path / "test_mismatched_checkpoint.hdf5"
+        TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            checkpoint=path,
+        )
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                {"x": [0, 1], "y": [0, 1, 2]},
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                checkpoint=path,
+            )
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            {"dt": 2},
+            {"steps": 2},
+            {"pattern_speed": 1 * u.km / u.s / u.kpc},
+            {"potential_function": lambda: 1.0},
+        ],
+    )
+    def test_checkpoint_different_settings(
+        self, ic_params, dummy_potential_func, dummy_backend, tmp_path, change
+    ):
+        ic_function, ic_values = ic_params
+        path = tmp_path / "checkpoint.hdf5"
+        kwargs = dict(potential_function=dummy_potential_func, dt=1, steps=1)
+        TessellationAnalysis(
+            ic_function, ic_values, **kwargs, backend=dummy_backend, checkpoint=path
+        )
+        kwargs.update(change)
+        with pytest.raises(ValueError, match="different settings"):
+            TessellationAnalysis(
+                ic_function, ic_values, **kwargs, backend=dummy_backend, checkpoint=path
+            )
+
+    def test_lazy(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            lazy=True,
+        )
+        eager = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        assert not analysis.done.any()
+
+        _, measure = analysis[(1, 2)]
+        assert measure == eager.measures[1, 2]
+        assert np.count_nonzero(analysis.done) == 1
+
+        row = analysis.hyperplane(x=0)
+        assert np.all(row == eager.measures[0])
+        assert np.all(analysis.done[0]) and np.count_nonzero(analysis.done) == 4
+
+        assert np.all(analysis.compute((slice(None), 1)) == eager.measures[:, 1])
+        assert np.all(analysis.compute() == eager.measures)
+        assert analysis.done.all()
+
+    def test_hyperplane_unknown_axis(self, analysis):
+        with pytest.raises(KeyError):
+            analysis.hyperplane(z=0)
+
+    def test_refinement(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, _ = ic_params
+        ic_values = {"x": np.arange(33), "y": np.arange(33)}
+        analysis = StepAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            refinement_levels=3,
+            refinement_threshold=0.5,
+        )
+        expected = np.zeros((33, 33))
+        expected[20:] = 1.0
+        assert np.all(analysis.resample() == expected)
+        assert np.count_nonzero(analysis.done) < analysis.size // 2
+        # only the cells around the step are computed at full resolution
+        assert analysis.done[18:21].all()
+        assert not analysis.done[1:8].any()
+        assert analysis.lazy is False
+
+    def test_lazy_refinement(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, _ = ic_params
+        ic_values = {"x": np.arange(9), "y": np.arange(9)}
+        analysis = StepAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            lazy=True,
+            refinement_levels=1,
+        )
+        assert analysis.lazy is True
+        assert not analysis.done.all()
+        analysis[8, 8]
+        assert analysis.done[8, 8]
+
+    def test_refinement_of_constant_measures(self, analysis):
+        image = analysis.refine(2, 0.1)
+        assert np.count_nonzero(analysis.done) == 4
+        assert np.all(image == analysis.measures[0, 0])
+
+    def test_invalid_refinement(self, analysis):
+        with pytest.raises(ValueError):
+            analysis.refine(-1, 0.1)
+        with pytest.raises(ValueError):
+            analysis.refine(1, -0.1)
+
+    def test_mask(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        mask = np.array([[True, False, True], [False, True, False], [True, True, True]])
+        analysis = CountingAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=3,
+            mask=mask,
+        )
+        assert sorted(analysis.integrated) == [tuple(p) for p in np.argwhere(mask)]
+        assert np.all(np.isnan(analysis.measures[~mask]))
+        assert not np.any(np.isnan(analysis.measures[mask]))
+
+        analysis.save(tmp_path / "test_mask.hdf5")
+        loaded = CountingAnalysis.read_from_hdf5(
+            tmp_path / "test_mask.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert np.all(loaded.mask == mask)
+        assert np.all(np.isnan(loaded.measures[~mask]))
+
+    def test_mask_predicate(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        analysis = CountingAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=3,
+            mask=lambda x, y: x >= y,
+        )
+        assert len(analysis.integrated) == 6
+        assert np.all(analysis.mask == np.tril(np.ones((3, 3), dtype=bool)))
+        assert np.isnan(analysis[(0, 2)][1])
+
+    def test_mismatched_mask(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                mask=np.ones((2, 3), dtype=bool),
+            )
+
+    def test_masked_refinement(self, analysis):
+        analysis.mask[:, 0] = False
+        analysis.measures[:, 0] = np.nan
+        analysis.done[:, 0] = True
+        image = analysis.refine(1, 0.1)
+        assert np.all(np.isnan(image[:, 0]))
+        assert not np.any(np.isnan(image[:, 1:]))
+
+    @pytest.mark.parametrize("integrate_in_workers", [False, True])
+    def test_iter_measures(
+        self, ic_params, dummy_potential_func, varying_backend, integrate_in_workers
+    ):
+        ic_function, ic_values = ic_params
+        analysis = ShuffledAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=varying_backend,
+            pidgey_chunksize=3,
+            integrate_in_workers=integrate_in_workers,
+            processes=2,
+            lazy=True,
+        )
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        results = dict(analysis.iter_measures())
+        assert sorted(results) == list(analysis)
+        for pixel, measure in results.items():
+            assert measure == serial[pixel]
+        # computed grid points are not yielded again
+        assert list(analysis.iter_measures()) == []
+
+    def test_iter_measures_per_chunk(self, analysis):
+        chunks = list(analysis.iter_measures((slice(None), 0), per_chunk=True))
+        assert [pixels for pixels, _ in chunks] == [[(0, 0), (1, 0), (2, 0)]]
+        assert np.all(chunks[0][1] == analysis.measures[:, 0])
+
+    def test_iter_measures_interrupted(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=3,
+            lazy=True,
+        )
+        measures = analysis.iter_measures(per_chunk=True)
+        next(measures)
+        measures.close()
+        assert np.count_nonzero(analysis.done) == 3
+
+    def test_callback(self, ic_params, dummy_potential_func, varying_backend):
+        ic_function, ic_values = ic_params
+        chunks = []
+        analysis = ShuffledAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=varying_backend,
+            pidgey_chunksize=3,
+            processes=2,
+            callback=lambda pixels, measures: chunks.append((pixels, measures)),
+        )
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        assert sorted(pixel for pixels, _ in chunks for pixel in pixels) == list(analysis)
+        for pixels, measures in chunks:
+            assert np.array_equal(measures, serial[tuple(np.transpose(pixels))])
+
+    @pytest.mark.parametrize("integrate_in_workers", [False, True])
+    @pytest.mark.parametrize("executor", [SerialExecutor, ThreadPoolExecutor])
+    def test_executor(
+        self, ic_params, dummy_potential_func, varying_backend, executor, integrate_in_workers
+    ):
+        ic_function, ic_values = ic_params
+        with executor() as pool:
+            analysis = TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=varying_backend,
+                pidgey_chunksize=3,
+                mp_chunksize=2,
+                pipeline_depth=1,
+                integrate_in_workers=integrate_in_workers,
+                executor=pool,
+            )
+        assert analysis.done.all()
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        assert np.array_equal(analysis.measures, serial)
+
+    def test_task_copy(self, analysis):
+        task = analysis._task_copy()
+        assert task.measures is None and task.executor is None
+        assert task.done is None and task.mask is None and task.callback is None
+        assert task.orbits is None and task.checkpoint is None
+        assert not task._potential_built and task._backend is None
+        # each task integrates with its own backend
+        assert type(task.backend) is type(analysis.backend)
+        assert task.backend is not analysis.backend
+        assert task.backend is not analysis._task_copy().backend
+
+    @pytest.mark.parametrize("integrate_in_workers", [False, True])
+    def test_executor_completion_order(
+        self, ic_params, dummy_potential_func, varying_backend, integrate_in_workers
+    ):
+        ic_function, ic_values = ic_params
+        BlockingAnalysis.calls = itertools.count()
+        BlockingAnalysis.released.clear()
+        BlockingAnalysis.waited = []
+        with ThreadPoolExecutor(2) as pool:
+            analysis = BlockingAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=varying_backend,
+                pidgey_chunksize=3,
+                pipeline_depth=2,
+                integrate_in_workers=integrate_in_workers,
+                executor=pool,
+                callback=lambda pixels, measures: BlockingAnalysis.released.set(),
+            )
+        assert analysis.done.all()
+        # chunks are collected as they complete, not in submission order
+        assert BlockingAnalysis.waited == [True]
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        assert np.array_equal(analysis.measures, serial)
+
+    @pytest.mark.parametrize("mp_chunksize", [1, 2])
+    def test_unordered_pool_results(
+        self, ic_params, dummy_potential_func, varying_backend, mp_chunksize
+    ):
+        ic_function, ic_values = ic_params
+        analysis = ShuffledAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=varying_backend,
+            pidgey_chunksize=9,
+            mp_chunksize=mp_chunksize,
+            processes=3,
+        )
+        # results are placed by the index they are tagged with, not their arrival order
+        serial = serial_measures(ic_function, ic_values, dummy_potential_func, varying_backend)
+        assert np.array_equal(analysis.measures, serial)
+
+    def test_process_pool_executor(self, ic_params, dummy_potential_func, varying_backend):
+        ic_function, ic_values = ic_params
+        with ProcessPoolExecutor(2) as pool:
+            analysis = TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=varying_backend,
+                axis_ratios=[0, 10],
+                executor=pool,
+            )
+        serial = serial_measures(
+            ic_function, ic_values, dummy_potential_func, varying_backend, axis_ratios=[0, 10]
+        )
+        assert np.array_equal(analysis.measures, serial)
+
+    def test_process_pool_integrate_in_workers(self, varying_backend):
+        ic_values = {"x": [0, 1, 2], "y": [0, 1, 2]}
+        completed = []
+        with ProcessPoolExecutor(2) as pool:
+            analysis = TessellationAnalysis(
+                grid_ic_function,
+                ic_values,
+                zero_potential,
+                1,
+                1,
+                backend=varying_backend,
+                pidgey_chunksize=3,
+                integrate_in_workers=True,
+                executor=pool,
+                # not picklable, so it must stay in this process
+                callback=lambda pixels, measures: completed.extend(pixels),
+            )
+        assert sorted(completed) == list(np.ndindex(3, 3))
+        serial = serial_measures(grid_ic_function, ic_values, zero_potential, varying_backend)
+        assert np.array_equal(analysis.measures, serial)
+
+    def test_failing_executor_evaluation(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with pytest.raises(RuntimeError, match="evaluation failed"):
+            FailingAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                executor=SerialExecutor(),
+            )
+
+    def test_shards(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        eager = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        paths = []
+        for i in range(2):
+            shard = CountingAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                shard=(i, 2),
+            )
+            assert sorted(shard.integrated) == list(shard)[i * 9 // 2 : (i + 1) * 9 // 2]
+            assert np.all(shard.done == shard.shard_selection())
+            paths.append(tmp_path / f"test_shard_{i}.hdf5")
+            shard.save(paths[-1])
+
+        CountingAnalysis.merge(paths, tmp_path / "test_merged.hdf5")
+        merged = CountingAnalysis.read_from_hdf5(
+            tmp_path / "test_merged.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert merged.shard is None
+        assert merged.done.all()
+        assert np.all(merged.measures == eager.measures)
+
+        with pytest.warns(UserWarning, match="do not cover"):
+            CountingAnalysis.merge(paths[:1], tmp_path / "test_merged.hdf5")
+
+    def test_inconsistent_shards(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        paths = []
+        for i, dt in enumerate([1, 2]):
+            shard = TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                dt,
+                1,
+                backend=dummy_backend,
+                shard=(i, 2),
+            )
+            paths.append(tmp_path / f"test_inconsistent_shard_{i}.hdf5")
+            shard.save(paths[-1])
+        with pytest.raises(ValueError):
+            TessellationAnalysis.merge(paths, tmp_path / "test_merged.hdf5")
+
+    @pytest.mark.parametrize(
+        "change, match",
+        [
+            ({"ic_values": {"x": [0, 1, 3], "y": [0, 1, 2]}}, "in x"),
+            ({"ic_values": {"x": [0, 1, 2, 3], "y": [0, 1, 2]}}, "shape"),
+            ({"mask": np.eye(3, dtype=bool)}, "mask"),
+        ],
+    )
+    def test_mismatched_shards(
+        self, ic_params, dummy_potential_func, dummy_backend, change, match, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        paths = []
+        for i in range(2):
+            kwargs = dict(ic_values=ic_values, mask=None)
+            if i == 1:
+                kwargs.update(change)
+            shard = TessellationAnalysis(
+                ic_function,
+                kwargs["ic_values"],
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                mask=kwargs["mask"],
+                shard=(i, 2),
+            )
+            paths.append(tmp_path / f"test_mismatched_shard_{i}.hdf5")
+            shard.save(paths[-1])
+        with pytest.raises(ValueError, match=match):
+            TessellationAnalysis.merge(paths, tmp_path / "test_merged.hdf5")
+
+    @pytest.mark.parametrize("shard", [(2, 2), (-1, 2), (0, 0)])
+    def test_invalid_shard(self, ic_params, dummy_potential_func, dummy_backend, shard):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                shard=shard,
+            )
+
+    def test_orbit_cache(
+        self, ic_params, dummy_potential_func, dummy_backend, monkeypatch, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        integrated = []
+        compute_orbit = dummy_backend._compute_orbit
+
+        def counting_compute_orbit(skycoord, *args):
+            integrated.append(skycoord.size)
+            return compute_orbit(skycoord, *args)
+
+        monkeypatch.setattr(dummy_backend, "_compute_orbit", counting_compute_orbit)
+        eager = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        integrated.clear()
+
+        kwargs = dict(backend=dummy_backend, orbit_cache=tmp_path, pidgey_chunksize=4)
+        first = TessellationAnalysis2D(ic_function, ic_values, dummy_potential_func, 1, 1, **kwargs)
+        assert sum(integrated) == 9
+        assert len(first.orbit_cache) == 9
+
+        # evaluation-only rerun, with different chunks
+        kwargs["pidgey_chunksize"] = 2
+        rerun = TessellationAnalysis(ic_function, ic_values, dummy_potential_func, 1, 1, **kwargs)
+        assert sum(integrated) == 9
+        assert np.all(rerun.measures == eager.measures)
+
+        # any change to the integration misses the cache
+        TessellationAnalysis(ic_function, ic_values, dummy_potential_func, 2, 1, **kwargs)
+        assert sum(integrated) == 18
+
+    def test_orbit_cache_dimensionless(
+        self, ic_params, dummy_potential_func, dimensionless_backend, monkeypatch, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        kwargs = dict(backend=dimensionless_backend, orbit_cache=tmp_path)
+        first = TessellationAnalysis(ic_function, ic_values, dummy_potential_func, 1, 1, **kwargs)
+        assert len(first.orbit_cache) == 9
+        (key,) = first.orbit_cache.keys(
+            first._integration_settings(), first._initial_conditions([(0, 0)])
+        )
+        assert np.all(first.orbit_cache.get(key) == [[0, 0, 0], [0, 0, 1], [0, 1, 0], [1, 0, 0]])
+
+        # evaluation-only rerun
+        monkeypatch.setattr(dimensionless_backend, "_compute_orbit", None)
+        rerun = TessellationAnalysis(ic_function, ic_values, dummy_potential_func, 1, 1, **kwargs)
+        assert np.all(rerun.measures == first.measures)
+
+    def test_orbit_cache_defers_backend(
+        self, ic_params, dummy_potential_func, dummy_backend, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        created = []
+
+        class CountingBackend(dummy_backend.__class__):
+            def __init__(self):
+                created.append(self)
+                super().__init__()
+
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=CountingBackend,
+            orbit_cache=tmp_path,
+            lazy=True,
+            _defer_potential=True,
+        )
+        assert created == []
+        analysis.compute((0, 0))
+        assert len(created) == 1
+        assert len(analysis.orbit_cache) == 1
+
+    def test_resume_with_orbit_cache(
+        self, ic_params, dummy_potential_func, dummy_backend, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        path = tmp_path / "checkpoint.hdf5"
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend, lazy=True
+        )
+        analysis.save(path)
+        resumed = TessellationAnalysis.resume(
+            path, backend_cls=dummy_backend.__class__, orbit_cache=tmp_path / "cache"
+        )
+        assert resumed.done.all()
+        assert len(resumed.orbit_cache) == 9
+        # the stored source of the potential function keys the cache
+        resumed.save(tmp_path / "resaved.hdf5")
+
+    def test_store_orbits(
+        self, ic_params, dummy_potential_func, dummy_backend, monkeypatch, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            mask=lambda x, y: x + y > 0,
+            store_orbits=True,
+        )
+        assert analysis.orbits.shape == (9, 4, 3)
+        assert analysis.orbits_unit == u.kpc
+        assert np.isnan(analysis.orbits[0]).all()
+        assert np.all(analysis.orbits[1:, 1] == [0, 0, 1])
+        analysis.save(tmp_path / "test_store_orbits.hdf5")
+        plain = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        with pytest.raises(ValueError):
+            plain.save(tmp_path / "test_no_orbits.hdf5", store_orbits=True)
+        plain.save(tmp_path / "test_no_orbits.hdf5")
+
+        def fail(*args):
+            raise AssertionError("orbits integrated again")
+
+        monkeypatch.setattr(dummy_backend, "_compute_orbit", fail)
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_store_orbits.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert loaded.orbits is None
+        sweep = loaded.reevaluate(
+            lambda orbit: Tessellation(orbit, incremental=False).measures_for_axis_ratios([0, 10])
+        )
+        assert sweep.shape == (3, 3, 2)
+        assert np.isnan(sweep[0, 0]).all()
+        assert np.all(sweep[..., 1][analysis.mask] == analysis.measures[analysis.mask])
+        assert np.array_equal(
+            analysis.reevaluate(loaded.__eval__), loaded.reevaluate(loaded.__eval__), equal_nan=True
+        )
+
+        without_orbits = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_no_orbits.hdf5", backend_cls=dummy_backend.__class__
+        )
+        with pytest.raises(ValueError):
+            without_orbits.reevaluate(loaded.__eval__)
+
+    def test_store_orbits_checkpoint(
+        self, ic_params, dummy_potential_func, dummy_backend, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        path = tmp_path / "test_store_orbits_checkpoint.hdf5"
+        kwargs = dict(backend=dummy_backend, store_orbits=True, pidgey_chunksize=3)
+        with pytest.raises(RuntimeError):
+            FailingAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                checkpoint=tmp_path / "test_failing_orbits_checkpoint.hdf5",
+                **kwargs,
+            )
+        with h5py.File(tmp_path / "test_failing_orbits_checkpoint.hdf5", "r") as f:
+            # the first chunk was integrated before evaluation failed
+            orbits = f["FailingAnalysis_orbits"][()]
+            assert orbits.shape == (9, 4, 3)
+            assert not np.isnan(orbits[:3]).any()
+            assert np.isnan(orbits[3:]).all()
+
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, checkpoint=path, **kwargs
+        )
+        # streamed to the checkpoint rather than kept
+        assert analysis.orbits is None
+        loaded = TessellationAnalysis.read_from_hdf5(path, backend_cls=dummy_backend.__class__)
+        assert np.all(loaded.reevaluate(loaded.__eval__) == analysis.measures)
+        assert np.all(analysis.reevaluate(analysis.__eval__) == analysis.measures)
+
+    def test_store_orbits_checkpoint_save(
+        self, ic_params, dummy_potential_func, dummy_backend, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            store_orbits=True,
+            mask=lambda x, y: x != y,
+            checkpoint=tmp_path / "checkpoint.hdf5",
+        )
+        analysis.save(tmp_path / "copy.hdf5")
+        with h5py.File(tmp_path / "checkpoint.hdf5", "r") as f:
+            orbits = f["TessellationAnalysis_orbits"][()]
+        with h5py.File(tmp_path / "copy.hdf5", "r") as f:
+            assert np.array_equal(f["TessellationAnalysis_orbits"][()], orbits, equal_nan=True)
+        assert np.isnan(orbits[::4]).all()
+        assert not np.isnan(np.delete(orbits, [0, 4, 8], axis=0)).any()
+
+    def test_store_orbits_selection(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            store_orbits=True,
+            lazy=True,
+        )
+        analysis[(1, 2)]
+        # only the computed grid point is kept
+        assert list(analysis._orbit_positions) == [5]
+        assert analysis.orbits.shape == (9, 4, 3)
+        assert not np.isnan(analysis.orbits[5]).any()
+        assert np.isnan(np.delete(analysis.orbits, 5, axis=0)).all()
+
+    @pytest.mark.parametrize("checkpoint", [False, True])
+    def test_store_orbits_dimensionless(
+        self, ic_params, dummy_potential_func, dimensionless_backend, tmp_path, checkpoint
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dimensionless_backend,
+            store_orbits=True,
+            pidgey_chunksize=3,
+            checkpoint=tmp_path / "checkpoint.hdf5" if checkpoint else None,
+        )
+        assert analysis.orbits_unit == u.dimensionless_unscaled
+        path = tmp_path / "checkpoint.hdf5" if checkpoint else tmp_path / "orbits.hdf5"
+        if not checkpoint:
+            analysis.save(path)
+        units = []
+
+        def evaluator(orbit):
+            units.append(orbit.x.unit)
+            return analysis.__eval__(orbit)
+
+        loaded = TessellationAnalysis.read_from_hdf5(
+            path, backend_cls=dimensionless_backend.__class__
+        )
+        assert np.all(loaded.reevaluate(evaluator) == analysis.measures)
+        assert np.all(analysis.reevaluate(evaluator) == analysis.measures)
+        assert set(units) == {u.dimensionless_unscaled}
+
+    def test_store_orbits_in_workers(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                integrate_in_workers=True,
+                store_orbits=True,
+            )
+
+    def test_evaluators(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        args = (ic_function, ic_values, dummy_potential_func, 1, 1)
+        measures_2d = TessellationAnalysis2D(*args, backend=dummy_backend).measures
+        measures_3d = TessellationAnalysis(*args, backend=dummy_backend).measures
+        evaluators = {"2d": TessellationAnalysis2D.__eval__, "3d": TessellationAnalysis.__eval__}
+        analysis = TessellationAnalysis(*args, backend=dummy_backend, evaluators=evaluators)
+        assert analysis.measures.shape == (3, 3, 2)
+        assert analysis.channel_names == ["2d", "3d"]
+        assert np.all(analysis.channel("2d") == measures_2d)
+        assert np.all(analysis.channel("3d") == measures_3d)
+        with pytest.raises(KeyError):
+            analysis.channel("1d")
+
+        analysis.save(tmp_path / "test_evaluators.hdf5")
+        with h5py.File(tmp_path / "test_evaluators.hdf5", "r") as f:
+            assert np.all(f["TessellationAnalysis_channels/2d"][()] == measures_2d)
+            assert np.all(f["TessellationAnalysis_channels/3d"][()] == measures_3d)
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_evaluators.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert loaded.channel_names == ["2d", "3d"]
+        assert np.all(loaded.channel("3d") == measures_3d)
+
+        paths = []
+        for i in range(2):
+            shard = TessellationAnalysis(
+                *args, backend=dummy_backend, evaluators=evaluators, shard=(i, 2)
+            )
+            paths.append(tmp_path / f"test_evaluators_shard_{i}.hdf5")
+            shard.save(paths[-1])
+        TessellationAnalysis.merge(paths, tmp_path / "test_evaluators_merged.hdf5")
+        with h5py.File(tmp_path / "test_evaluators_merged.hdf5", "r") as f:
+            assert np.all(f["TessellationAnalysis_channels/2d"][()] == measures_2d)
+
+    def test_evaluator_names(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        args = (ic_function, ic_values, dummy_potential_func, 1, 1)
+        analysis = TessellationAnalysis(
+            *args,
+            backend=dummy_backend,
+            evaluators=[TessellationAnalysis2D.__eval__, TessellationAnalysis.__eval__],
+        )
+        assert analysis.channel_names == [
+            "TessellationAnalysis2D.__eval__",
+            "TessellationAnalysis.__eval__",
+        ]
+        analysis = TessellationAnalysis(
+            *args,
+            backend=dummy_backend,
+            evaluators=[TessellationAnalysis.__eval__, TessellationAnalysis.__eval__],
+        )
+        assert analysis.channel_names == ["0", "1"]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"evaluators": []},
+            {"evaluators": {"a/b": TessellationAnalysis.__eval__}},
+            {"evaluators": [TessellationAnalysis.__eval__], "axis_ratios": [0, 10]},
+        ],
+    )
+    def test_invalid_evaluators(self, ic_params, dummy_potential_func, dummy_backend, kwargs):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend, **kwargs
+            )
+
+    @pytest.mark.parametrize("compression", [None, "gzip", "lzf"])
+    @pytest.mark.parametrize("dtype", [None, np.float32])
+    def test_save_layout(
+        self, ic_params, dummy_potential_func, dummy_backend, compression, dtype, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            axis_ratios=[0, 10],
+        )
+        path = tmp_path / "test_save_layout.hdf5"
+        analysis.save(path, compression=compression, dtype=dtype)
+        with h5py.File(path, "r") as f:
+            dset = f["TessellationAnalysis"]
+            assert dset.chunks == (3, 3, 1)
+            assert dset.compression == compression
+            assert dset.dtype == np.dtype(dtype or float)
+
+        loaded = TessellationAnalysis.read_from_hdf5(
+            path, backend_cls=dummy_backend.__class__, lazy_measures=True
+        )
+        assert isinstance(loaded.measures, h5py.Dataset)
+        assert np.allclose(loaded.measures[:, :, 1], analysis.measures[:, :, 1])
+        loaded.close()
+        assert isinstance(loaded.measures, np.ndarray)
+        assert np.allclose(loaded.measures, analysis.measures)
+
+    def test_lazy_measures_closed(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        path = tmp_path / "test_lazy_measures.hdf5"
+        analysis.save(path)
+        kwargs = dict(backend_cls=dummy_backend.__class__, lazy_measures=True)
+        with TessellationAnalysis.read_from_hdf5(path, **kwargs) as loaded:
+            assert isinstance(loaded.measures, h5py.Dataset)
+            f = loaded._measures_file
+        assert not f
+        assert np.all(loaded.measures == analysis.measures)
+
+        # dropped without closing
+        f = TessellationAnalysis.read_from_hdf5(path, **kwargs)._measures_file
+        gc.collect()
+        assert not f
+
+    def test_large_plane_chunks(self, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function = lambda x, y: c.SkyCoord(x=x * u.kpc, y=y * u.kpc, z=0 * u.kpc)
+        ic_values = {"x": np.arange(600), "y": np.arange(500)}
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            _blank_measures=True,
+        )
+        path = tmp_path / "test_large_plane_chunks.hdf5"
+        analysis.save(path)
+        with h5py.File(path, "r") as f:
+            # 2.4 MB planes, tiled like h5py's automatic chunks
+            assert f["TessellationAnalysis"].chunks == (300, 250)
+
+    @pytest.mark.parametrize("kwargs", [{"compression": "zip"}, {"dtype": int}])
+    def test_invalid_save_layout(
+        self, ic_params, dummy_potential_func, dummy_backend, kwargs, tmp_path
+    ):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        with pytest.raises(ValueError):
+            analysis.save(tmp_path / "test_invalid_save_layout.hdf5", **kwargs)
+
+    def test_autotune(self, ic_params, dummy_potential_func, dummy_backend, capsys):
+        ic_function, ic_values = ic_params
+        eager = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=2,
+            autotune=True,
+        )
+        assert np.all(analysis.measures == eager.measures)
+        # a warm-up orbit, then trials of 1, 2, 4 and 8 orbits, the last one cut short by the
+        # end of the grid
+        assert analysis.tuning["warmup"]["chunksize"] == 1
+        assert [trial["chunksize"] for trial in analysis.tuning["trials"]] == [1, 2, 4, 1]
+        assert analysis.pidgey_chunksize == analysis.tuning["pidgey_chunksize"]
+        assert analysis.mp_chunksize == analysis.tuning["mp_chunksize"]
+        assert 1 <= analysis.mp_chunksize <= analysis.pidgey_chunksize
+        assert analysis.tuning["orbit_bytes"] == 4 * 3 * 8
+        assert "autotuned pidgey_chunksize=" in capsys.readouterr().out
+
+    def test_autotune_ranks_total_time(
+        self, ic_params, dummy_potential_func, dummy_backend, monkeypatch
+    ):
+        ic_function, _ = ic_params
+        clock = {"seconds": 0.0, "orbits": 0}
+
+        class TimedAnalysis(TessellationAnalysis):
+            # integration takes 1 s per chunk, evaluation 0.1 s per orbit and orbit in the chunk
+            def _integrate_chunk(self, pixels):
+                clock["seconds"] += 1.0
+                clock["orbits"] = len(pixels)
+                return super()._integrate_chunk(pixels)
+
+            def _evaluator(self):
+                def evaluate(orbit):
+                    clock["seconds"] += 0.1 * clock["orbits"]
+                    return 0.0
+
+                return evaluate
+
+        monkeypatch.setattr(time, "perf_counter", lambda: clock["seconds"])
+        analysis = TimedAnalysis(
+            ic_function,
+            {"x": np.arange(6), "y": np.arange(6)},
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=2,
+            lazy=True,
+        )
+        tuning = analysis.autotune()
+        assert [trial["chunksize"] for trial in tuning["trials"]] == [1, 2, 4, 8]
+        # 8 orbits integrate fastest, but 4 orbits integrate and evaluate fastest
+        assert analysis.pidgey_chunksize == 4
+
+    def test_autotune_memory_budget(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            pidgey_chunksize=4,
+            lazy=True,
+            memory_budget=2 * 4 * 3 * 8,
+        )
+        tuning = analysis.autotune()
+        # a warm-up orbit, then trials of 1, 2, 4, 8 and 16 orbits, capped to two orbits in memory
+        assert [trial["chunksize"] for trial in tuning["trials"]] == [1, 2, 2, 2, 1]
+        assert analysis.pidgey_chunksize <= 2
+        assert analysis.done.all()
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                memory_budget=0,
+            )
+
+    def test_axis_ratio_sweep(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            axis_ratios=[0, 10, np.inf],
+        )
+        single = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        assert analysis.measures.shape == (3, 3, 3)
+        assert np.all(analysis.measures[..., 0] == 0.0)
+        assert np.allclose(analysis.measures[..., 1], single.measures)
+
+        analysis.save(tmp_path / "test_sweep.hdf5")
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_sweep.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert np.all(loaded.axis_ratios == analysis.axis_ratios)
+        assert np.allclose(loaded.measures, analysis.measures)
+
+    def test_normalization_sweep(self, ic_params, dummy_potential_func, dummy_backend, tmp_path):
+        ic_function, ic_values = ic_params
+        analysis = TessellationAnalysis(
+            ic_function,
+            ic_values,
+            dummy_potential_func,
+            1,
+            1,
+            backend=dummy_backend,
+            axis_ratios=[0, 10],
+            normalization_routines="all",
+        )
+        routines = ["sphere", "cylinder", "Rz_convexhull", "convexhull", "convexhull_rot4"]
+        assert analysis.normalization_routines == routines
+        assert analysis.measures.shape == (3, 3, 2, 5)
+        assert np.all(analysis.measures[..., 0, :] == 0.0)
+        single = TessellationAnalysis(
+            ic_function, ic_values, dummy_potential_func, 1, 1, backend=dummy_backend
+        )
+        assert np.allclose(analysis.measures[..., 1, -1], single.measures)
+
+        analysis.save(tmp_path / "test_sweep.hdf5")
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_sweep.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert loaded.normalization_routines == routines
+
+    def test_unrecognized_normalization_sweep(self, ic_params, dummy_potential_func, dummy_backend):
+        ic_function, ic_values = ic_params
+        with pytest.raises(ValueError):
+            TessellationAnalysis(
+                ic_function,
+                ic_values,
+                dummy_potential_func,
+                1,
+                1,
+                backend=dummy_backend,
+                normalization_routines=["unknown"],
+            )
+
 
 class TestAnalysis2D:
     @pytest.fixture
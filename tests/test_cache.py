@@ -0,0 +1,103 @@
+import os
+
+import astropy.units as u
+import numpy as np
+import pytest
+from astropy import coordinates as c
+
+from commensurability.cache import OrbitCache, integration_digest
+
+
+@pytest.fixture
+def ics():
+    return c.SkyCoord(
+        x=[1, 2, 1] * u.kpc,
+        y=[0, 0, 0] * u.kpc,
+        z=[0, 0, 0] * u.kpc,
+        v_x=[0, 0, 0] * u.km / u.s,
+        v_y=[200, 200, 200] * u.km / u.s,
+        v_z=[0, 0, 0] * u.km / u.s,
+        representation_type="cartesian",
+    )
+
+
+@pytest.fixture
+def digest():
+    return integration_digest(
+        "def potential_function(): ...", 1 * u.Gyr, 10, 0 * u.km / u.s / u.kpc, object
+    )
+
+
+class TestOrbitCache:
+    def test_keys(self, tmp_path, ics, digest):
+        cache = OrbitCache(tmp_path)
+        keys = cache.keys(digest, ics)
+        assert len(keys) == 3
+        assert keys[0] == keys[2] != keys[1]
+        assert cache.keys(digest, ics) == keys
+        # the same initial conditions in other units
+        converted = c.SkyCoord(
+            x=[1000, 2000, 1000] * u.pc,
+            y=[0, 0, 0] * u.pc,
+            z=[0, 0, 0] * u.pc,
+            v_x=[0, 0, 0] * u.m / u.s,
+            v_y=[200000, 200000, 200000] * u.m / u.s,
+            v_z=[0, 0, 0] * u.m / u.s,
+            representation_type="cartesian",
+        )
+        assert cache.keys(digest, converted) == keys
+        other = integration_digest(
+            "def potential_function(): ...", 1 * u.Gyr, 11, 0 * u.km / u.s / u.kpc, object
+        )
+        assert set(cache.keys(other, ics)).isdisjoint(keys)
+
+    def test_get_put(self, tmp_path):
+        cache = OrbitCache(tmp_path)
+        positions = np.arange(30.0).reshape(10, 3)
+        assert cache.get("a") is None
+        cache.put("a", positions)
+        assert np.all(cache.get("a") == positions)
+        assert len(cache) == 1
+        assert OrbitCache(tmp_path).size == cache.size > 0
+
+    def test_lru_eviction(self, tmp_path):
+        positions = np.zeros((10, 3))
+        cache = OrbitCache(tmp_path)
+        cache.put("a", positions)
+        entry_size = cache.size
+        cache = OrbitCache(tmp_path, max_bytes=10 * entry_size)
+        keys = "abcdefghij"
+        for key in keys[1:]:
+            cache.put(key, positions)
+        # make "a" the least recently used entry, then use it
+        for i, key in enumerate(keys):
+            os.utime(tmp_path / f"{key}.npy", ns=(i, i))
+        assert cache.get("a") is not None
+        cache.put("k", positions)
+        # shrunk below the cap, evicting the two least recently used entries
+        assert cache.get("b") is None and cache.get("c") is None
+        assert all(cache.get(key) is not None for key in "adefghijk")
+        assert cache.size == 9 * entry_size
+
+        cache.evict()
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    def test_no_scan_below_cap(self, tmp_path, monkeypatch):
+        positions = np.zeros((10, 3))
+        cache = OrbitCache(tmp_path)
+        cache.put("a", positions)
+        cache = OrbitCache(tmp_path, max_bytes=10 * cache.size)
+        # exceeding the cap evicts down to 9 entries, leaving room for the next one
+        for key in "bcdefghijk":
+            cache.put(key, positions)
+
+        def fail():
+            raise AssertionError("cache directory scanned")
+
+        monkeypatch.setattr(cache, "_entries", fail)
+        cache.put("l", positions)
+
+    def test_invalid_max_bytes(self, tmp_path):
+        with pytest.raises(ValueError):
+            OrbitCache(tmp_path, max_bytes=0)
@@ -0,0 +1,210 @@
+import threading
+from multiprocessing.connection import Client
+
+import numpy as np
+import pytest
+from astropy import coordinates as c
+from astropy import units as u
+
+from commensurability import TessellationAnalysis
+from commensurability.coordinator import Coordinator, run_worker
+
+AUTHKEY = b"test"
+
+
+def ic_function(x, y):
+    return c.SkyCoord(
+        x=x * u.kpc,
+        y=y * u.kpc,
+        z=0 * u.kpc,
+        v_x=x * u.km / u.s,
+        v_y=y * u.km / u.s,
+        v_z=0 * u.km / u.s,
+        representation_type="cartesian",
+    )
+
+
+def dummy_potential():
+    return 0.0
+
+
+@pytest.fixture
+def make_analysis(dummy_backend):
+    def make_analysis(cls=TessellationAnalysis, **kwargs):
+        return cls(
+            ic_function,
+            {"x": [0, 1, 2], "y": [0, 1, 2]},
+            dummy_potential,
+            1,
+            1,
+            backend=dummy_backend,
+            **kwargs,
+        )
+
+    return make_analysis
+
+
+class FailingAnalysis(TessellationAnalysis):
+    @staticmethod
+    def __eval__(orbit):
+        raise RuntimeError("evaluation failed")
+
+
+def start_workers(analyses, address):
+    counts = [None] * len(analyses)
+
+    def work(i, analysis):
+        counts[i] = run_worker(analysis, address, authkey=AUTHKEY)
+
+    threads = [
+        threading.Thread(target=work, args=(i, analysis), daemon=True)
+        for i, analysis in enumerate(analyses)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, counts
+
+
+class TestCoordinator:
+    def test_run(self, make_analysis, dummy_backend, tmp_path):
+        eager = make_analysis()
+        coordinator = Coordinator(make_analysis(lazy=True), authkey=AUTHKEY, chunksize=2)
+        threads, counts = start_workers(
+            [make_analysis(lazy=True) for _ in range(2)], coordinator.address
+        )
+        analysis = coordinator.run(tmp_path / "test_coordinator.hdf5")
+        for thread in threads:
+            thread.join(timeout=5)
+        assert sum(counts) == 5
+        assert analysis.done.all()
+        assert np.all(analysis.measures == eager.measures)
+
+        loaded = TessellationAnalysis.read_from_hdf5(
+            tmp_path / "test_coordinator.hdf5", backend_cls=dummy_backend.__class__
+        )
+        assert np.all(loaded.measures == eager.measures)
+
+    def test_requeue_on_disconnect(self, make_analysis):
+        eager = make_analysis()
+        coordinator = Coordinator(make_analysis(lazy=True), authkey=AUTHKEY, chunksize=4)
+        thread = threading.Thread(target=coordinator.run, daemon=True)
+        thread.start()
+
+        # a worker disappearing with a chunk
+        with Client(coordinator.address, authkey=AUTHKEY) as conn:
+            conn.send(("hello", "TessellationAnalysis", coordinator._digest))
+            assert conn.recv() == ("welcome",)
+            assert conn.recv()[0] == "chunk"
+
+        threads, counts = start_workers([make_analysis(lazy=True)], coordinator.address)
+        thread.join(timeout=5)
+        threads[0].join(timeout=5)
+        assert counts == [3]
+        assert coordinator.analysis.done.all()
+        assert np.all(coordinator.analysis.measures == eager.measures)
+
+    def test_requeue_on_timeout(self, make_analysis):
+        eager = make_analysis()
+        coordinator = Coordinator(
+            make_analysis(lazy=True), authkey=AUTHKEY, chunksize=9, lease_timeout=0.2
+        )
+        thread = threading.Thread(target=coordinator.run, daemon=True)
+        thread.start()
+
+        # a worker holding on to its chunk without answering
+        with Client(coordinator.address, authkey=AUTHKEY) as conn:
+            conn.send(("hello", "TessellationAnalysis", coordinator._digest))
+            assert conn.recv() == ("welcome",)
+            assert conn.recv()[0] == "chunk"
+            threads, counts = start_workers([make_analysis(lazy=True)], coordinator.address)
+            thread.join(timeout=5)
+            threads[0].join(timeout=5)
+        assert counts == [1]
+        assert np.all(coordinator.analysis.measures == eager.measures)
+
+    def test_reject_mismatched_worker(self, make_analysis, dummy_backend):
+        coordinator = Coordinator(make_analysis(lazy=True), authkey=AUTHKEY)
+        thread = threading.Thread(target=coordinator.run, daemon=True)
+        thread.start()
+        worker = TessellationAnalysis(
+            ic_function,
+            {"x": [0, 1], "y": [0, 1]},
+            dummy_potential,
+            1,
+            1,
+            backend=dummy_backend,
+            lazy=True,
+        )
+        with pytest.raises(RuntimeError, match="rejected"):
+            run_worker(worker, coordinator.address, authkey=AUTHKEY)
+
+        start_workers([make_analysis(lazy=True)], coordinator.address)
+        thread.join(timeout=5)
+        assert coordinator.analysis.done.all()
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"ic_values": {"x": [0, 1, 3], "y": [0, 1, 2]}},
+            {"dt": 2},
+            {"steps": 2},
+            {"pattern_speed": 10},
+            {"axis_ratios": [0, 10]},
+            {"evaluators": {"zero": lambda orbit: 0.0}},
+        ],
+    )
+    def test_reject_mismatched_settings(self, make_analysis, dummy_backend, kwargs):
+        coordinator = Coordinator(make_analysis(lazy=True), authkey=AUTHKEY)
+        thread = threading.Thread(target=coordinator.run, daemon=True)
+        thread.start()
+        settings = dict(ic_values={"x": [0, 1, 2], "y": [0, 1, 2]}, dt=1, steps=1)
+        settings.update(kwargs)
+        worker = TessellationAnalysis(
+            ic_function,
+            settings.pop("ic_values"),
+            dummy_potential,
+            settings.pop("dt"),
+            settings.pop("steps"),
+            backend=dummy_backend,
+            lazy=True,
+            **settings,
+        )
+        with pytest.raises(RuntimeError, match="settings differ"):
+            run_worker(worker, coordinator.address, authkey=AUTHKEY)
+
+        start_workers([make_analysis(lazy=True)], coordinator.address)
+        thread.join(timeout=5)
+        assert coordinator.analysis.done.all()
+
+    def test_failing_store(self, make_analysis, monkeypatch):
+        analysis = make_analysis(lazy=True)
+
+        def store_chunk(pixels, values):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(analysis, "_store_chunk", store_chunk)
+        coordinator = Coordinator(analysis, authkey=AUTHKEY, chunksize=2)
+        threads, _ = start_workers([make_analysis(lazy=True)], coordinator.address)
+        with pytest.raises(RuntimeError, match="disk full"):
+            coordinator.run()
+        threads[0].join(timeout=5)
+        assert not analysis.done.any()
+
+    def test_failing_worker(self, make_analysis):
+        coordinator = Coordinator(make_analysis(FailingAnalysis, lazy=True), authkey=AUTHKEY)
+        worker = make_analysis(FailingAnalysis, lazy=True)
+
+        def work():
+            with pytest.raises(RuntimeError, match="evaluation failed"):
+                run_worker(worker, coordinator.address, authkey=AUTHKEY)
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        with pytest.raises(RuntimeError, match="evaluation failed"):
+            coordinator.run()
+        thread.join(timeout=5)
+
+    @pytest.mark.parametrize("kwargs", [{"chunksize": -1}, {"lease_timeout": 0}])
+    def test_invalid_options(self, make_analysis, kwargs):
+        with pytest.raises(ValueError):
+            Coordinator(make_analysis(lazy=True), authkey=AUTHKEY, **kwargs)
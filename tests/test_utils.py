@@ -1,7 +1,28 @@
 import astropy.coordinates as c
 import astropy.units as u
+import numpy as np
+import pytest
 
-from commensurability.utils import collapse_coords, make_quantity
+from commensurability.utils import (
+    broadcast_components,
+    broadcast_coords,
+    collapse_coords,
+    coords_close,
+    make_quantity,
+)
+
+
+def make_coord(x=1, v_x=4):
+    return c.SkyCoord(
+        x=x * u.kpc,
+        y=2 * u.kpc,
+        z=3 * u.kpc,
+        v_x=v_x * u.km / u.s,
+        v_y=5 * u.km / u.s,
+        v_z=6 * u.km / u.s,
+        frame="galactocentric",
+        representation_type="cartesian",
+    )
 
 
 class TestMakeQuantity:
@@ -75,3 +96,84 @@ class TestCollapseCoords:
             representation_type="cartesian",
         )
         assert all(collapse_coords(coords) == coords)
+
+    def test_single_coord_list(self):
+        result = collapse_coords([make_coord()])
+        assert result.shape == (1,)
+        assert result[0].x == 1 * u.kpc
+
+
+class TestBroadcastCoords:
+    def test_scalar_coord(self):
+        result = broadcast_coords(make_coord(), 3)
+        assert result.shape == (3,)
+        assert all(result.v_x == 4 * u.km / u.s)
+
+    def test_coord_collection(self):
+        coords = make_coord(x=[1, 7], v_x=[4, 10])
+        assert broadcast_coords(coords, 2) is coords
+
+    def test_mismatched_size(self):
+        with pytest.raises(ValueError):
+            broadcast_coords(make_coord(x=[1, 7], v_x=[4, 10]), 3)
+
+    def test_not_a_coord(self):
+        with pytest.raises(TypeError):
+            broadcast_coords([1, 2, 3], 3)
+
+
+def constant_velocity(x):
+    return c.SkyCoord(
+        x=x * u.kpc,
+        y=2 * u.kpc,
+        z=3 * u.kpc,
+        v_x=4 * u.km / u.s,
+        v_y=5 * u.km / u.s,
+        v_z=6 * u.km / u.s,
+        frame="galactocentric",
+        representation_type="cartesian",
+        galcen_distance=8 * u.kpc,
+    )
+
+
+class TestBroadcastComponents:
+    def test_constant_velocity(self):
+        with pytest.raises(ValueError):
+            constant_velocity(np.array([1, 7]))
+        coords = broadcast_components(constant_velocity)(np.array([1, 7]))
+        assert type(coords) is c.SkyCoord
+        assert coords.shape == (2,)
+        assert all(coords.v_x == 4 * u.km / u.s)
+        assert coords.galcen_distance == 8 * u.kpc
+
+    def test_module_alias(self):
+        assert broadcast_components(make_coord)(x=np.array([1, 7])).shape == (2,)
+
+    def test_original_untouched(self):
+        broadcast_components(constant_velocity)(np.array([1, 7]))
+        assert constant_velocity.__globals__["c"] is c
+        with pytest.raises(ValueError):
+            constant_velocity(np.array([1, 7]))
+
+    def test_unrelated_function(self):
+        function = lambda x: x
+        assert broadcast_components(function) is function
+        assert broadcast_components(max) is max
+
+    def test_mismatched_shapes(self):
+        with pytest.raises(ValueError):
+            broadcast_components(make_coord)(x=np.array([1, 7]), v_x=np.array([4, 10, 16]))
+
+
+class TestCoordsClose:
+    def test_same_coords(self):
+        assert coords_close(make_coord(), make_coord())
+
+    def test_different_positions(self):
+        assert not coords_close(make_coord(), make_coord(x=2))
+
+    def test_different_velocities(self):
+        assert not coords_close(make_coord(), make_coord(v_x=5))
+
+    def test_different_frames(self):
+        assert not coords_close(make_coord(), make_coord().transform_to("icrs"))
@@ -0,0 +1,82 @@
+import pickle
+
+import astropy.coordinates as c
+import astropy.units as u
+import numpy as np
+import pytest
+
+from commensurability import workers
+from commensurability.workers import (
+    SharedOrbits,
+    evaluate_indexed_orbit,
+    evaluate_orbit,
+    evaluate_orbits,
+    evaluate_shared_orbit,
+    init_worker,
+    integrate_and_evaluate,
+)
+
+
+@pytest.fixture
+def orbits():
+    xyz = np.random.default_rng(0).normal(size=(3, 5, 20))
+    return c.CartesianRepresentation(xyz, unit=u.kpc)
+
+
+class TestSharedOrbits:
+    def test_positions(self, orbits):
+        with SharedOrbits.from_orbits(orbits) as block:
+            assert block.shape == (5, 20, 3)
+            assert len(block) == 5
+            assert np.all(block.positions() == np.moveaxis(orbits.xyz.value, 0, -1))
+
+    def test_orbit(self, orbits):
+        with SharedOrbits.from_orbits(orbits) as block:
+            orbit = block.orbit(2)
+            assert orbit.shape == (20,)
+            assert np.all(orbit.xyz == orbits[2].xyz)
+
+    def test_pickled_block_attaches(self, orbits):
+        with SharedOrbits.from_orbits(orbits) as block:
+            copy = pickle.loads(pickle.dumps(block))
+            assert copy.name == block.name
+            assert copy.unit == u.kpc
+            assert np.all(copy.positions() == block.positions())
+            del copy
+            workers._attached.pop(block.name).close()
+
+    def test_single_orbit(self, orbits):
+        with SharedOrbits.from_orbits(orbits[0]) as block:
+            assert block.shape == (1, 20, 3)
+
+
+class TestWorkerFunctions:
+    def test_uninitialized(self, orbits):
+        init_worker(None)
+        with pytest.raises(RuntimeError):
+            evaluate_orbit(orbits[0])
+
+    def test_evaluate_shared_orbit(self, orbits):
+        init_worker(lambda orbit: float(np.sum(orbit.x.value)))
+        with SharedOrbits.from_orbits(orbits) as block:
+            for i in range(len(block)):
+                index, value = evaluate_shared_orbit((block, i))
+                assert index == i
+                assert np.isclose(value, np.sum(orbits[i].x.value))
+        init_worker(None)
+
+    def test_evaluate_indexed_orbit(self, orbits):
+        init_worker(lambda orbit: float(np.sum(orbit.x.value)))
+        index, value = evaluate_indexed_orbit((2, orbits[2]))
+        assert index == 2
+        assert np.isclose(value, np.sum(orbits[2].x.value))
+        init_worker(None)
+
+    def test_uninitialized_analysis(self):
+        init_worker(None)
+        with pytest.raises(RuntimeError):
+            integrate_and_evaluate([(0,)])
+
+    def test_evaluate_orbits(self, orbits):
+        values = evaluate_orbits(lambda orbit: float(np.sum(orbit.x.value)), orbits[1:3])
+        assert np.allclose(values, [np.sum(orbits[1].x.value), np.sum(orbits[2].x.value)])